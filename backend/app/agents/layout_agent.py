@@ -11,21 +11,170 @@ LLM-Enhanced Features:
 - Ambiguous layout resolution: "Is this a table or just aligned text?"
 - Context-aware region classification
 """
+import os
 import re
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
 from typing import List, Dict, Tuple, Optional
 from collections import defaultdict
 
+import numpy as np
+
 from app.models.document_graph import (
-    DocumentGraph, Token, Region, BBox, 
-    TokenType, RegionType, ExtractionMethod
+    DocumentGraph, DecisionLog, Token, TokenArray, Region, BBox, 
+    TokenType, RegionType, ExtractionMethod, TOKEN_TYPE_CODES
 )
-from app.services.llm import LLM, LLMRole
+from app.services.llm import LLM, LLMRole, get_llm_service
+from app.utils.keyword_matcher import KeywordMatcher
+from app.utils.process_pool import worker_context
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Prefer RE2 (linear-time DFA matching) for token classification when installed.
+# Only boolean search is needed here, so RE2's missing features don't matter.
+try:
+    import re2
+    RE2_AVAILABLE = True
+except ImportError:
+    re2 = None
+    RE2_AVAILABLE = False
+
+_regex_engine = re2 if RE2_AVAILABLE else re
+
+# Token types that mark a line as data (never a heading), and the subset
+# that marks a line as a table row
+_DATA_VALUE_TYPES = frozenset((
+    TokenType.NUMBER, TokenType.CURRENCY, TokenType.DATA_VOLUME,
+    TokenType.DATE, TokenType.TIME, TokenType.DURATION
+))
+_TABLE_VALUE_TYPES = frozenset((
+    TokenType.NUMBER, TokenType.CURRENCY, TokenType.DATA_VOLUME, TokenType.DATE
+))
+
+# Numba compiles the line-clustering scan to native code for dense pages
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    numba = None
+    NUMBA_AVAILABLE = False
+
+# Pages with fewer tokens than this cluster in pure Python: the scan takes a
+# few milliseconds there, less than compiling (or loading) the kernel, which
+# happens on first use rather than at import
+NUMBA_MIN_TOKENS = 10_000
+
+
+def _line_starts(centers: List[float], tolerance: float) -> List[int]:
+    """
+    Find where each line begins in a list of y-sorted token centers.
+    
+    A token joins the current line while its center is within tolerance of the
+    line's first token; this anchor comparison is inherently sequential, unlike
+    a plain gap split which would chain drifting lines together.
+    
+    Returns:
+        Start index of every line (always begins with 0)
+    """
+    starts = [0]
+    anchor = centers[0]
+    for i, center in enumerate(centers):
+        if abs(center - anchor) > tolerance:
+            starts.append(i)
+            anchor = center
+    return starts
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True)
+    def _line_starts_native(centers: np.ndarray, tolerance: float) -> np.ndarray:
+        """Compiled version of _line_starts over a float64 array"""
+        starts = np.empty(centers.shape[0], dtype=np.int64)
+        starts[0] = 0
+        count = 1
+        anchor = centers[0]
+        for i in range(centers.shape[0]):
+            if abs(centers[i] - anchor) > tolerance:
+                starts[count] = i
+                count += 1
+                anchor = centers[i]
+        return starts[:count]
+
+
+# pdfplumber document a layout worker process keeps open for its pool's PDF
+# (see _init_layout_worker). A pool lays out one job's pages and is shut down
+# with it, and each worker is single-threaded, so nothing else shares it
+_worker_pdf = None
+
+
+def _open_plumber(pdf_path: str):
+    """Open a PDF with pdfplumber (imported here, so OCR-only jobs never load it)"""
+    import pdfplumber
+    
+    return pdfplumber.open(pdf_path)
+
+
+def _init_layout_worker(pdf_path: str) -> None:
+    """
+    Pool initializer: open the PDF once per worker.
+    
+    pdfplumber.open parses the xref table and page tree, so opening per page
+    makes a layout pass over P pages O(P^2).
+    """
+    global _worker_pdf
+    _worker_pdf = _open_plumber(pdf_path)
+
+
+def _extract_page_words(pdf, page_num: int) -> Tuple[float, float, List[dict]]:
+    """
+    Page size and pdfplumber words for one page of an open document.
+    
+    Raises:
+        IndexError: If the page doesn't exist
+    """
+    if page_num >= len(pdf.pages):
+        raise IndexError(f"Page {page_num} out of range (PDF has {len(pdf.pages)} pages)")
+    
+    page = pdf.pages[page_num]
+    
+    try:
+        # Extract words with accurate bounding boxes
+        return page.width, page.height, page.extract_words(use_text_flow=True, keep_blank_chars=False)
+    finally:
+        # Drop the page's parsed objects; the document stays open for the next page
+        page.close()
+
+
+def _process_page_worker(args: Tuple[str, int]) -> Tuple[List[Token], List[Region], DecisionLog]:
+    """
+    Run LayoutAgent.process_page for one page in a worker process.
+    
+    The page is processed into a scratch graph, so token IDs in the returned
+    regions start at 0 and must be offset when merged.
+    """
+    pdf_path, page_num = args
+    scratch = DocumentGraph(job_id=f"layout_p{page_num}", pdf_path=pdf_path)
+    LayoutAgent.process_page(scratch, page_num, pdf_path, pdf=_worker_pdf)
+    return scratch.tokens, scratch.regions, scratch.decisions
+
+
+def _caps_ratio(text: str) -> float:
+    """
+    Fraction of ASCII letters in text that are uppercase.
+    
+    Digits, spaces and punctuation are ignored, so "TOTAL: $12.00" counts as
+    fully capitalized. Classification runs over a uint32 codepoint array.
+    """
+    cp = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    upper = (cp >= 0x41) & (cp <= 0x5A)
+    lower = (cp >= 0x61) & (cp <= 0x7A)
+    letters = int(upper.sum() + lower.sum())
+    return int(upper.sum()) / max(letters, 1)
+
 
 class LayoutAgent:
     """
@@ -39,7 +188,7 @@ class LayoutAgent:
         Args:
             llm_service: Optional LLM service for ambiguous layout decisions
         """
-        self.llm_service = llm_service or LLM() if settings.enable_llm_agents else None
+        self.llm_service = (llm_service or get_llm_service()) if settings.enable_llm_agents else None
         self.use_llm = settings.enable_llm_agents and self.llm_service is not None
     
     # Type inference patterns
@@ -49,6 +198,7 @@ class LayoutAgent:
             r'\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4}',
             r'\d{1,2}\s+[A-Z][a-z]{2}',  # "06 Oct"
         ],
+        # Also covers durations; _time_or_duration tells the two apart
         TokenType.TIME: [
             r'\d{1,2}:\d{2}(?::\d{2})?(?:\s*[AP]M)?',
         ],
@@ -57,14 +207,11 @@ class LayoutAgent:
         ],
         TokenType.CURRENCY: [
             r'[$£€¥]\s*\d+(?:,\d{3})*(?:\.\d{2})?',
-            r'\d+(?:,\d{3})*(?:\.\d{2})??\s*(?:USD|EUR|GBP|AUD)',
+            r'\d+(?:,\d{3})*(?:\.\d{2})?\s*(?:USD|EUR|GBP|AUD)',
         ],
         TokenType.DATA_VOLUME: [
             r'\d+(?:\.\d+)?\s*(?:KB|MB|GB|TB)',
         ],
-        TokenType.DURATION: [
-            r'\d{1,2}:\d{2}:\d{2}',
-        ],
         TokenType.EMAIL: [
             r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
         ],
@@ -73,6 +220,35 @@ class LayoutAgent:
         ],
     }
     
+    # Patterns compiled once at import, in the same priority order as PATTERNS.
+    # Case-insensitivity is inlined because re2.compile takes no flags argument.
+    _COMPILED_PATTERNS: List[Tuple[TokenType, list]] = [
+        (token_type, [_regex_engine.compile(f"(?i){pattern}") for pattern in patterns])
+        for token_type, patterns in PATTERNS.items()
+    ]
+    
+    # Single-pass classifier: one lookahead plus an empty marker group per
+    # pattern, tried in PATTERNS order at position 0. The first alternative whose
+    # pattern occurs anywhere in the text wins, so m.lastindex gives the same
+    # answer as the per-pattern loop in one regex call (a plain alternation would
+    # pick the leftmost match instead, e.g. "$70.00" as CURRENCY not PHONE).
+    # RE2 has no lookaheads, so with RE2 the compiled loop above is used.
+    _GROUP_TYPES: List[TokenType] = [
+        token_type for token_type, patterns in PATTERNS.items() for _ in patterns
+    ]
+    _COMBINED_PATTERN: Optional[re.Pattern] = None if RE2_AVAILABLE else re.compile(
+        "(?is)" + "|".join(
+            f"(?=.*?(?:{pattern}))()" for patterns in PATTERNS.values() for pattern in patterns
+        )
+    )
+    
+    # TIME pattern with its parts captured: hours, minutes, seconds, AM/PM
+    _TIME_PARTS = _regex_engine.compile(r'(?i)(\d{1,2}):(\d{2})(?::(\d{2}))?(\s*[AP]M)?')
+    
+    # Every pattern above needs a digit or an '@' somewhere in the text, so
+    # ASCII tokens without one of these can skip regex matching entirely
+    _CLASSIFIABLE_CHARS = frozenset("0123456789@")
+    
     # Heading keywords
     HEADING_KEYWORDS = [
         'summary', 'total', 'calls', 'messages', 'data', 'usage',
@@ -87,17 +263,62 @@ class LayoutAgent:
         '1 gigabyte', '1 megabyte', '1 gb =', '1 mb ='
     ]
     
+    # Strong heading keywords (specific section indicators)
+    STRONG_HEADING_KEYWORDS = [
+        'summary', 'total calls', 'total messages', 'total data',
+        'invoice', 'statement', 'billing details', 'charges',
+        'mobile number', 'plan details', 'account summary'
+    ]
+    
+    # Keyword lists compiled once into single-scan matchers
+    _STOP_CUE_MATCHER = KeywordMatcher(TABLE_STOP_CUES)
+    _STRONG_HEADING_MATCHER = KeywordMatcher(STRONG_HEADING_KEYWORDS)
+    
     @staticmethod
+    @lru_cache(maxsize=4096)
     def infer_token_type(text: str) -> TokenType:
-        """Classify token by pattern matching"""
+        """
+        Classify token by pattern matching.
+        
+        Memoized: invoices repeat the same short strings (headers, units,
+        dates) many times per page, so repeats become a dict lookup.
+        """
         text = text.strip()
         
-        for token_type, patterns in LayoutAgent.PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    return token_type
+        # Fast path for plain words (non-ASCII text may hold Unicode digits)
+        if text.isascii() and LayoutAgent._CLASSIFIABLE_CHARS.isdisjoint(text):
+            return TokenType.TEXT
+        
+        token_type = TokenType.TEXT
+        
+        if LayoutAgent._COMBINED_PATTERN is not None:
+            match = LayoutAgent._COMBINED_PATTERN.match(text)
+            if match:
+                token_type = LayoutAgent._GROUP_TYPES[match.lastindex - 1]
+        else:
+            token_type = next(
+                (t for t, patterns in LayoutAgent._COMPILED_PATTERNS
+                 if any(pattern.search(text) for pattern in patterns)),
+                TokenType.TEXT
+            )
+        
+        if token_type == TokenType.TIME:
+            return LayoutAgent._time_or_duration(text)
+        return token_type
+    
+    @staticmethod
+    def _time_or_duration(text: str) -> TokenType:
+        """
+        Disambiguate a TIME pattern match.
         
-        return TokenType.TEXT
+        Without an AM/PM suffix, a value with seconds (00:01:23) or more than
+        23 hours (47:30) is a duration; everything else is a time of day.
+        """
+        match = LayoutAgent._TIME_PARTS.search(text)
+        hours, _, seconds, meridiem = match.groups()
+        if not meridiem and (seconds is not None or int(hours) > 23):
+            return TokenType.DURATION
+        return TokenType.TIME
     
     @staticmethod
     def extract_tokens_from_pdf(pdf_path: str, page_num: int) -> List[Token]:
@@ -105,61 +326,73 @@ class LayoutAgent:
         Extract tokens from PDF using pdfplumber for accurate word-level bounding boxes.
         Falls back to OCR if needed.
         """
-        import pdfplumber
+        token_array = LayoutAgent.extract_token_array(pdf_path, page_num)
+        return token_array.to_tokens() if token_array is not None else []
+    
+    @staticmethod
+    def extract_token_array(pdf_path: str, page_num: int, pdf=None) -> Optional[TokenArray]:
+        """
+        Extract a page's words straight into a TokenArray.
         
-        tokens = []
+        Coordinates are collected into arrays and normalized in one vector
+        operation per field; no Token/BBox objects are created here.
+        
+        Args:
+            pdf: pdfplumber document already open on pdf_path, to share across
+                pages (otherwise the file is opened for this page only)
         
+        Returns:
+            TokenArray, or None if the page has too little native text (OCR needed)
+        """
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                if page_num >= len(pdf.pages):
-                    logger.error(f"Page {page_num} out of range (PDF has {len(pdf.pages)} pages)")
-                    return []
-                
-                page = pdf.pages[page_num]
-                page_width = page.width
-                page_height = page.height
-                
-                # Extract words with accurate bounding boxes
-                words = page.extract_words(use_text_flow=True, keep_blank_chars=False)
-                
-                for word in words:
-                    text = word["text"].strip()
-                    if not text:
-                        continue
-                    
-                    # pdfplumber coordinates: x0, top, x1, bottom
-                    x0 = word["x0"]
-                    x1 = word["x1"]
-                    top = word["top"]
-                    bottom = word["bottom"]
-                    
-                    # Normalize to 0..1 range
-                    norm_x = x0 / page_width if page_width > 0 else 0
-                    norm_y = top / page_height if page_height > 0 else 0
-                    norm_width = (x1 - x0) / page_width if page_width > 0 else 0.1
-                    norm_height = (bottom - top) / page_height if page_height > 0 else 0.01
-                    
-                    token = Token(
-                        text=text,
-                        bbox=BBox(norm_x, norm_y, norm_width, norm_height),
-                        page=page_num,
-                        token_type=LayoutAgent.infer_token_type(text),
-                        confidence=1.0,
-                        source=ExtractionMethod.PDF_NATIVE
-                    )
-                    tokens.append(token)
-                
-                if len(tokens) < 10:
-                    logger.info(f"Page {page_num} has little native text ({len(tokens)} tokens), OCR recommended")
-                    return []
-                
-                logger.info(f"Extracted {len(tokens)} tokens from page {page_num} using pdfplumber")
+            try:
+                with (nullcontext(pdf) if pdf is not None else _open_plumber(pdf_path)) as doc:
+                    page_width, page_height, words = _extract_page_words(doc, page_num)
+            except IndexError as e:
+                logger.error(str(e))
+                return None
+            
+            texts = [word["text"].strip() for word in words]
+            words = [word for word, text in zip(words, texts) if text]
+            texts = [text for text in texts if text]
+            n = len(words)
+            
+            if n < 10:
+                logger.info(f"Page {page_num} has little native text ({n} tokens), OCR recommended")
+                return None
+            
+            # pdfplumber coordinates: x0, top, x1, bottom
+            x0 = np.fromiter((w["x0"] for w in words), dtype=np.float64, count=n)
+            x1 = np.fromiter((w["x1"] for w in words), dtype=np.float64, count=n)
+            top = np.fromiter((w["top"] for w in words), dtype=np.float64, count=n)
+            bottom = np.fromiter((w["bottom"] for w in words), dtype=np.float64, count=n)
+            
+            # Normalize to 0..1 range
+            if page_width > 0:
+                xs = x0 / page_width
+                ws = (x1 - x0) / page_width
+            else:
+                xs = np.zeros(n)
+                ws = np.full(n, 0.1)
+            if page_height > 0:
+                ys = top / page_height
+                hs = (bottom - top) / page_height
+            else:
+                ys = np.zeros(n)
+                hs = np.full(n, 0.01)
             
+            types = np.fromiter(
+                (TOKEN_TYPE_CODES[LayoutAgent.infer_token_type(text)] for text in texts),
+                dtype=np.int8, count=n
+            )
+            
+            logger.info(f"Extracted {n} tokens from page {page_num} using pdfplumber")
+        
         except Exception as e:
             logger.error(f"Failed to extract tokens from PDF: {e}")
-            return []
+            return None
         
-        return tokens
+        return TokenArray(xs=xs, ys=ys, ws=ws, hs=hs, texts=texts, types=types, page=page_num)
     
     @staticmethod
     def cluster_tokens_into_lines(tokens: List[Token], y_tolerance: Optional[float] = None) -> List[List[Token]]:
@@ -174,66 +407,108 @@ class LayoutAgent:
         if not tokens:
             return []
         
+        token_array = TokenArray.from_tokens(tokens, tokens[0].page)
+        line_indices = LayoutAgent._cluster_line_indices(token_array, y_tolerance)
+        return [[tokens[i] for i in idx] for idx in line_indices]
+    
+    @staticmethod
+    def _cluster_line_indices(token_array: TokenArray, y_tolerance: Optional[float] = None) -> List[List[int]]:
+        """
+        Array form of cluster_tokens_into_lines.
+        
+        Returns:
+            One list of token indices per line, top to bottom, each left to right
+        """
+        if not len(token_array):
+            return []
+        
+        xs, ys, hs = token_array.xs, token_array.ys, token_array.hs
+        
         # Calculate adaptive tolerance based on median token height if not provided
         if y_tolerance is None:
-            token_heights = [t.bbox.h for t in tokens if t.bbox.h > 0]
-            if token_heights:
-                median_height = sorted(token_heights)[len(token_heights) // 2]
+            token_heights = hs[hs > 0]
+            if token_heights.size:
+                # Upper median via selection (same value as sorted(...)[n // 2])
+                mid = token_heights.size // 2
+                median_height = float(np.partition(token_heights, mid)[mid])
                 y_tolerance = median_height * 0.5
                 logger.info(f"Using adaptive y_tolerance: {y_tolerance:.4f} (median height: {median_height:.4f})")
             else:
                 y_tolerance = 0.01
         
-        # Sort by y position (top to bottom), then x (left to right)
-        sorted_tokens = sorted(tokens, key=lambda t: (t.bbox.y, t.bbox.x))
+        order = LayoutAgent._reading_order(token_array)
         
-        lines = []
-        current_line = [sorted_tokens[0]]
-        current_y = sorted_tokens[0].bbox.y
+        # Use vertical center for more accurate line clustering
+        centers = (ys + hs / 2)[order]
+        if NUMBA_AVAILABLE and centers.size >= NUMBA_MIN_TOKENS:
+            starts = _line_starts_native(centers, y_tolerance)
+        else:
+            starts = _line_starts(centers.tolist(), y_tolerance)
         
-        for token in sorted_tokens[1:]:
-            # Use vertical center for more accurate line clustering
-            token_y = token.bbox.y + (token.bbox.h / 2)
-            current_center_y = current_y + (current_line[0].bbox.h / 2)
-            
-            if abs(token_y - current_center_y) <= y_tolerance:
-                current_line.append(token)
-            else:
-                # Sort tokens in line by x position (left to right)
-                current_line.sort(key=lambda t: t.bbox.x)
-                lines.append(current_line)
-                current_line = [token]
-                current_y = token.bbox.y
+        line_indices = []
+        for line_order in np.split(order, starts[1:]):
+            # Sort tokens in line by x position (left to right)
+            line_order = line_order[np.argsort(xs[line_order], kind="stable")]
+            line_indices.append(line_order.tolist())
         
-        if current_line:
-            current_line.sort(key=lambda t: t.bbox.x)
-            lines.append(current_line)
+        logger.info(f"Clustered {len(token_array)} tokens into {len(line_indices)} lines (tolerance: {y_tolerance:.4f})")
+        return line_indices
+    
+    @staticmethod
+    def _reading_order(token_array: TokenArray) -> np.ndarray:
+        """
+        Token indices sorted by y (top to bottom), then x (left to right).
         
-        logger.info(f"Clustered {len(tokens)} tokens into {len(lines)} lines (tolerance: {y_tolerance:.4f})")
-        return lines
+        On the uint16 quantized keys NumPy's stable sort is a radix sort, so
+        two LSD passes bucket the tokens in O(n) instead of a comparison sort.
+        The quantized view clips to the page and merges sub-quantum gaps, so
+        off-page geometry, or a bucketed order that differs from the float
+        (y, x) order, falls back to a float sort.
+        """
+        xs, ys = token_array.xs, token_array.ys
+        if xs.size and (min(xs.min(), ys.min()) < 0.0 or max(xs.max(), ys.max()) > 1.0):
+            return np.lexsort((xs, ys))
+        
+        quantized = token_array.quantized()
+        order = np.argsort(quantized['x'], kind="stable")
+        order = order[np.argsort(quantized['y'][order], kind="stable")]
+        
+        # Equal float keys share a bucket and keep input order, so a sequence
+        # already in float order is exactly what the stable float sort gives
+        sorted_ys, sorted_xs = ys[order], xs[order]
+        dy = np.diff(sorted_ys)
+        if np.any((dy < 0) | ((dy == 0) & (np.diff(sorted_xs) < 0))):
+            return np.lexsort((xs, ys))
+        return order
     
     @staticmethod
-    def detect_headings(lines: List[List[Token]]) -> List[Tuple[int, str]]:
+    def detect_headings(
+        lines: List[List[Token]],
+        line_texts: Optional[List[str]] = None
+    ) -> List[Tuple[int, str]]:
         """
         Detect heading lines that indicate section boundaries.
         
+        Args:
+            line_texts: Optional precomputed line texts from _line_texts(lines)
+        
         Returns:
             List of (line_index, heading_text) tuples
         """
+        if line_texts is None:
+            line_texts = LayoutAgent._line_texts(lines)
+        
         headings = []
         
         for idx, line_tokens in enumerate(lines):
             if not line_tokens:
                 continue
-                
-            line_text = ' '.join(t.text for t in line_tokens)
+            
+            line_text = line_texts[idx]
             line_text_lower = line_text.lower()
             
             # Exclude lines with data values (these are table rows, not headings)
-            has_data_values = any(t.token_type in [TokenType.NUMBER, TokenType.CURRENCY, 
-                                                    TokenType.DATA_VOLUME, TokenType.DATE,
-                                                    TokenType.TIME, TokenType.DURATION] 
-                                 for t in line_tokens)
+            has_data_values = any(t.token_type in _DATA_VALUE_TYPES for t in line_tokens)
             
             if has_data_values:
                 continue
@@ -246,15 +521,12 @@ class LayoutAgent:
             is_heading = False
             
             # 1. Strong heading keyword match (specific section indicators)
-            strong_keywords = ['summary', 'total calls', 'total messages', 'total data', 
-                              'invoice', 'statement', 'billing details', 'charges',
-                              'mobile number', 'plan details', 'account summary']
-            if any(keyword in line_text_lower for keyword in strong_keywords):
+            if LayoutAgent._STRONG_HEADING_MATCHER.search(line_text_lower):
                 is_heading = True
             
             # 2. All caps AND substantive (not just noise)
             elif len(line_text) > 10:
-                caps_ratio = sum(1 for c in line_text if c.isupper()) / len(line_text)
+                caps_ratio = _caps_ratio(line_text)
                 # Require very high caps ratio and no lowercase (strict)
                 if caps_ratio > 0.85 and len(line_tokens) >= 2:
                     is_heading = True
@@ -266,7 +538,13 @@ class LayoutAgent:
         return headings
     
     @staticmethod
-    def propose_table_regions(lines: List[List[Token]], page_num: int, token_id_map: Dict[Token, int] = None) -> List[Region]:
+    def propose_table_regions(
+        lines: List[List[Token]],
+        page_num: int,
+        line_token_ids: Optional[List[List[int]]] = None,
+        line_extents: Optional[np.ndarray] = None,
+        line_texts_lower: Optional[List[str]] = None
+    ) -> List[Region]:
         """
         Detect table-like structures in lines.
         
@@ -274,12 +552,17 @@ class LayoutAgent:
         - Multiple consecutive lines with similar token counts
         - Tokens roughly aligned vertically (similar x positions)
         - Contains dates, numbers, or data volumes
+        
+        Args:
+            line_token_ids: Optional graph token IDs of every line, parallel to lines
+            line_extents: Optional per-line bboxes from _line_extents(lines)
+            line_texts_lower: Optional lowercased line texts from _line_texts(lines)
         """
         if len(lines) < 3:
             return []
         
-        if token_id_map is None:
-            token_id_map = {}
+        if line_texts_lower is None:
+            line_texts_lower = [text.lower() for text in LayoutAgent._line_texts(lines)]
         
         regions = []
         current_table_start = None
@@ -287,21 +570,20 @@ class LayoutAgent:
         
         for idx, line_tokens in enumerate(lines):
             # Check for semantic stop cues (totals, unit explanations)
-            line_text = ' '.join(t.text for t in line_tokens).lower()
-            is_stop_cue = any(cue in line_text for cue in LayoutAgent.TABLE_STOP_CUES)
+            line_text = line_texts_lower[idx]
+            is_stop_cue = LayoutAgent._STOP_CUE_MATCHER.search(line_text)
             
             # Check if line looks table-like
             has_structure = len(line_tokens) >= 2
-            has_numbers = any(t.token_type in [TokenType.NUMBER, TokenType.CURRENCY, 
-                                               TokenType.DATA_VOLUME, TokenType.DATE] 
-                             for t in line_tokens)
+            has_numbers = any(t.token_type in _TABLE_VALUE_TYPES for t in line_tokens)
             
             # Stop cues end the table
             if is_stop_cue and current_table_lines:
                 logger.info(f"Stop cue detected at line {idx}: '{line_text[:50]}'")
                 if len(current_table_lines) >= 3:
                     region = LayoutAgent._create_table_region(
-                        current_table_lines, page_num, current_table_start
+                        current_table_lines, page_num, current_table_start,
+                        line_extents=line_extents
                     )
                     if region:
                         regions.append(region)
@@ -315,7 +597,8 @@ class LayoutAgent:
                 # End of potential table
                 if len(current_table_lines) >= 3:
                     region = LayoutAgent._create_table_region(
-                        current_table_lines, page_num, current_table_start, token_id_map
+                        current_table_lines, page_num, current_table_start, line_token_ids,
+                        line_extents
                     )
                     if region:
                         regions.append(region)
@@ -327,7 +610,8 @@ class LayoutAgent:
         if current_table_lines and len(current_table_lines) >= 3:
             logger.info(f"Flushing open table at end of page: {len(current_table_lines)} lines")
             region = LayoutAgent._create_table_region(
-                current_table_lines, page_num, current_table_start, token_id_map
+                current_table_lines, page_num, current_table_start, line_token_ids,
+                line_extents
             )
             if region:
                 regions.append(region)
@@ -339,23 +623,38 @@ class LayoutAgent:
         table_lines: List[List[Token]], 
         page_num: int, 
         start_idx: int,
-        token_id_map: Dict[Token, int] = None
+        line_token_ids: Optional[List[List[int]]] = None,
+        line_extents: Optional[np.ndarray] = None
     ) -> Optional[Region]:
-        """Create a table region from accumulated lines"""
+        """
+        Create a table region from accumulated lines.
+        
+        Table lines are consecutive, so bboxes and token IDs are taken from
+        rows start_idx..start_idx+len(table_lines) of the per-line arrays.
+        """
         all_tokens = [t for line in table_lines for t in line]
         if not all_tokens:
             return None
         
         # Calculate bounding box
-        min_x = min(t.bbox.x for t in all_tokens)
-        min_y = min(t.bbox.y for t in all_tokens)
-        max_x = max(t.bbox.x + t.bbox.width for t in all_tokens)
-        max_y = max(t.bbox.y + t.bbox.height for t in all_tokens)
-        
-        # Get token IDs if mapping provided
+        if line_extents is not None:
+            extents = line_extents[start_idx:start_idx + len(table_lines)]
+            min_x, min_y = extents[:, :2].min(axis=0).tolist()
+            max_x, max_y = extents[:, 2:].max(axis=0).tolist()
+        else:
+            # One pass to gather corners, then C-level reductions
+            corners = np.array([
+                (t.bbox.x, t.bbox.y, t.bbox.x + t.bbox.width, t.bbox.y + t.bbox.height)
+                for t in all_tokens
+            ])
+            min_x, min_y = corners[:, :2].min(axis=0).tolist()
+            max_x, max_y = corners[:, 2:].max(axis=0).tolist()
+        
+        # Get token IDs if provided
         token_ids = []
-        if token_id_map:
-            token_ids = [token_id_map[id(t)] for t in all_tokens if id(t) in token_id_map]
+        if line_token_ids:
+            for ids in line_token_ids[start_idx:start_idx + len(table_lines)]:
+                token_ids.extend(ids)
         
         # Calculate alignment score for confidence
         alignment_score = LayoutAgent._calculate_alignment_score(table_lines)
@@ -375,10 +674,41 @@ class LayoutAgent:
         return region
     
     @staticmethod
-    def process_page(graph: DocumentGraph, page_num: int, pdf_path: str) -> None:
+    def _line_texts(lines: List[List[Token]]) -> List[str]:
+        """Space-joined text of every line, built once and shared by the line passes"""
+        return [' '.join(t.text for t in line_tokens) for line_tokens in lines]
+    
+    @staticmethod
+    def _line_extents(token_array: TokenArray, line_indices: List[List[int]]) -> np.ndarray:
+        """
+        Bounding box of every line, one (min_x, min_y, max_x, max_y) row per line.
+        
+        Built once per page so heading and table regions take their bbox from
+        a slice of this array instead of rescanning their tokens.
+        """
+        if not line_indices:
+            return np.empty((0, 4))
+        
+        flat = np.fromiter((i for idx in line_indices for i in idx), dtype=np.intp)
+        xs, ys = token_array.xs[flat], token_array.ys[flat]
+        
+        # Offset of each line's first token in the flattened arrays
+        offsets = np.cumsum([0] + [len(idx) for idx in line_indices[:-1]])
+        return np.column_stack((
+            np.minimum.reduceat(xs, offsets),
+            np.minimum.reduceat(ys, offsets),
+            np.maximum.reduceat(xs + token_array.ws[flat], offsets),
+            np.maximum.reduceat(ys + token_array.hs[flat], offsets),
+        ))
+    
+    @staticmethod
+    def process_page(graph: DocumentGraph, page_num: int, pdf_path: str, pdf=None) -> None:
         """
         Main entry point: process a page and populate the graph.
         
+        pdf is an optional pdfplumber document already open on pdf_path (see
+        extract_token_array).
+        
         Steps:
         1. Extract tokens
         2. Cluster into lines
@@ -388,41 +718,41 @@ class LayoutAgent:
         logger.info(f"LayoutAgent processing page {page_num}")
         
         # Step 1: Extract tokens
-        tokens = LayoutAgent.extract_tokens_from_pdf(pdf_path, page_num)
+        token_array = LayoutAgent.extract_token_array(pdf_path, page_num, pdf)
         
-        if not tokens:
+        if token_array is None:
             logger.warning(f"No tokens extracted from page {page_num}, OCR needed")
-            graph.decisions.append({
-                "agent": "layout_agent",
-                "page": page_num,
-                "decision": "ocr_needed",
-                "reason": "No native PDF text found"
-            })
+            graph.decisions.record(
+                agent="layout_agent",
+                page=page_num,
+                decision="ocr_needed",
+                reason="No native PDF text found"
+            )
             return
         
-        # Add tokens to graph and build token ID map (using id() as key since Token is unhashable)
-        token_id_map = {}
+        # Token objects are only materialized for the graph; layout passes use the arrays
+        tokens = token_array.to_tokens()
+        
+        # Tokens get consecutive graph IDs, so array index i maps to base_id + i
+        base_id = graph.next_token_id()
         for token in tokens:
-            token_id = graph.add_token(token)
-            token_id_map[id(token)] = token_id
+            graph.add_token(token)
         
-        # Step 2: Cluster into lines
-        lines = LayoutAgent.cluster_tokens_into_lines(tokens)
+        # Step 2: Cluster into lines (geometry work runs on the array view)
+        line_indices = LayoutAgent._cluster_line_indices(token_array)
+        lines = [[tokens[i] for i in idx] for idx in line_indices]
+        line_token_ids = [[base_id + i for i in idx] for idx in line_indices]
+        line_extents = LayoutAgent._line_extents(token_array, line_indices)
+        line_texts = LayoutAgent._line_texts(lines)
         
         # Step 3: Detect headings
-        headings = LayoutAgent.detect_headings(lines)
+        headings = LayoutAgent.detect_headings(lines, line_texts)
         
         for line_idx, heading_text in headings:
             # Create heading regions
             line_tokens = lines[line_idx]
             if line_tokens:
-                min_x = min(t.bbox.x for t in line_tokens)
-                min_y = min(t.bbox.y for t in line_tokens)
-                max_x = max(t.bbox.x + t.bbox.width for t in line_tokens)
-                max_y = max(t.bbox.y + t.bbox.height for t in line_tokens)
-                
-                # Get token IDs for this heading
-                heading_token_ids = [token_id_map[id(t)] for t in line_tokens if id(t) in token_id_map]
+                min_x, min_y, max_x, max_y = line_extents[line_idx].tolist()
                 
                 region = Region(
                     region_id=f"heading_p{page_num}_l{line_idx}",
@@ -432,15 +762,85 @@ class LayoutAgent:
                     detected_by="layout_agent",
                     confidence=0.8,
                     hints={"text": heading_text},
-                    token_ids=heading_token_ids
+                    token_ids=line_token_ids[line_idx]
                 )
                 graph.add_region(region)
         
         # Step 4: Propose table regions
-        table_regions = LayoutAgent.propose_table_regions(lines, page_num, token_id_map)
+        # Plain lower() on purpose: CPython lowercases ASCII in a single C pass,
+        # cheaper than islower()/isupper() pre-checks that would skip the copy
+        line_texts_lower = [text.lower() for text in line_texts]
+        table_regions = LayoutAgent.propose_table_regions(
+            lines, page_num, line_token_ids, line_extents, line_texts_lower
+        )
         for region in table_regions:
             graph.add_region(region)
     
+    @staticmethod
+    def process_pages(
+        graph: DocumentGraph,
+        page_nums: List[int],
+        pdf_path: str,
+        max_workers: Optional[int] = None,
+        pages_per_chunk: int = 32
+    ) -> None:
+        """
+        Batch entry point: run process_page for several pages in parallel.
+        
+        Pages are independent, so each one is laid out in its own process
+        (pdfplumber and regex work is CPU-bound and holds the GIL). Results are
+        merged into the graph in page order, giving the same token IDs, regions
+        and decisions as calling process_page sequentially.
+        
+        Workers take contiguous page ranges of up to pages_per_chunk pages
+        (fewer when that would leave workers idle). The PDF is opened once per
+        worker, or once for the whole call when run inline, and closed when
+        the call returns.
+        
+        Args:
+            max_workers: Process count (defaults to the CPU count; 1 runs inline)
+            pages_per_chunk: Upper bound on pages handed to a worker at once
+        """
+        workers = min(max_workers or os.cpu_count() or 1, len(page_nums))
+        
+        if workers <= 1:
+            with _open_plumber(pdf_path) as pdf:
+                for page_num in page_nums:
+                    LayoutAgent.process_page(graph, page_num, pdf_path, pdf)
+            return
+        
+        logger.info(f"LayoutAgent processing {len(page_nums)} pages with {workers} workers")
+        
+        chunksize = max(1, min(pages_per_chunk, -(-len(page_nums) // workers)))
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=worker_context(),
+            initializer=_init_layout_worker,
+            initargs=(pdf_path,)
+        ) as executor:
+            results = list(executor.map(_process_page_worker, [(pdf_path, p) for p in page_nums],
+                                        chunksize=chunksize))
+        
+        for tokens, regions, decisions in results:
+            LayoutAgent.merge_page_layout(graph, tokens, regions, decisions)
+    
+    @staticmethod
+    def merge_page_layout(graph: DocumentGraph, tokens: List[Token], regions: List[Region],
+                          decisions: DecisionLog) -> None:
+        """
+        Add one page laid out in a scratch graph (by a worker) to the graph.
+        
+        The regions' token IDs are offset by the tokens already in the graph,
+        so merging pages in order gives the IDs process_page would have.
+        """
+        offset = len(graph.tokens)
+        graph.tokens.extend(tokens)
+        for region in regions:
+            region.token_ids = [tid + offset for tid in region.token_ids]
+            graph.add_region(region)
+        graph.decisions.extend(decisions)
+    
     @staticmethod
     def _calculate_alignment_score(table_lines: List[List[Token]]) -> float:
         """
@@ -488,7 +888,7 @@ class LayoutAgent:
         Args:
             regions: List of proposed regions
             page_tokens: All tokens on the page for context
-            
+        
         Returns:
             Enhanced/reclassified regions
         """
@@ -525,7 +925,7 @@ class LayoutAgent:
                     region.confidence = llm_result["confidence"]
                     region.hints["llm_reasoning"] = llm_result.get("reasoning", "")
                     logger.info(f"LLM reclassified {region.region_id}: {llm_result['region_type']} (conf={llm_result['confidence']:.2f})")
-                
+            
             except Exception as e:
                 logger.error(f"LLM analysis failed for {region.region_id}: {e}")
             
@@ -14,21 +14,113 @@ LLM-Enhanced Features:
 - Context-aware error recovery
 """
 import logging
-from typing import List, Dict, Optional, Tuple
-from datetime import datetime
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Set, Tuple
 
 from app.models.document_graph import (
-    DocumentGraph, Region, Extraction, AgentDecision,
+    DocumentGraph, Region, Extraction, AgentDecision, BBox,
     RegionType, ValidationStatus, ExtractionMethod, JobOutcome
 )
-from app.agents.layout_agent import LayoutAgent
 from app.agents.structure_gate import StructureGate
-from app.services.llm import LLM, LLMRole
-from app.config import get_settings
+from app.services.llm import LLM, LLMRole, get_llm_service
+from app.services.pdf_backend import open_pdf
+from app.services.extraction_cache import ExtractionCache, pdf_fingerprint
+from app.utils.process_pool import worker_context
+from app.config import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Strings repeated in every per-page/per-retry decision record, shared
+# rather than rebuilt so the audit trail columns hold one object each
+_AGENT_ORCH = sys.intern("orchestrator")
+_DEC_OCR = sys.intern("use_ocr")
+_DEC_PDF = sys.intern("use_pdf_text")
+_REASON_NATIVE = sys.intern("PDF has native text")
+_REASON_NO_TEXT_LAYER = sys.intern("No text layer detected")
+_REASON_INSUFFICIENT = sys.intern("Insufficient native text")
+
+# (second, "YYYY-MM-DDTHH:MM:SS") for the last timestamp formatted; one
+# tuple so threads never see a second paired with another second's text
+_timestamp_cache: Tuple[int, str] = (-1, "")
+
+
+def _now_iso() -> str:
+    """
+    Current local time as an ISO 8601 string with microseconds, like
+    datetime.now().isoformat() but only formatting the date and time once
+    per second; trace and decision records ask for one every few steps.
+    """
+    global _timestamp_cache
+    second, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_second, prefix = _timestamp_cache
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(second))
+        _timestamp_cache = (second, prefix)
+    return f"{prefix}.{micros:06d}"
+
+
+# The job's orchestrator and pdfplumber document in a page worker process
+# (set by _init_page_worker). A pool serves one job, so neither outlives it
+_worker_orchestrator: Optional["ExpertOrchestrator"] = None
+_worker_pdf = None
+
+
+def _init_page_worker(pdf_path: str, job_id: str, pages: List[Dict], parent_settings: Settings) -> None:
+    """
+    Pool initializer: set up a worker for one job's pages.
+    
+    Workers are sent only the PDF path, job ID, the page metadata from
+    ingest and the parent's settings (which may not match this process's
+    environment). Each builds its own orchestrator and opens the PDF once
+    for layout.
+    """
+    import pdfplumber
+    
+    global _worker_orchestrator, _worker_pdf, settings
+    settings = parent_settings
+    _worker_orchestrator = ExpertOrchestrator(pdf_path, job_id, parallel=False, in_page_worker=True)
+    _worker_orchestrator.graph.pages = pages
+    _worker_pdf = pdfplumber.open(pdf_path)
+
+
+def _process_page_worker(page_num: int):
+    """
+    Lay out and process one page in a worker process.
+    
+    The page runs in a fresh scratch graph, so token IDs in the returned
+    regions start at 0 and must be offset when merged. Layout output (tokens,
+    regions after gating, layout decisions) and processing output
+    (extractions, trace entries, decisions, and whether the page needs the
+    Camelot fallback) come back separately, so the parent can merge them in
+    the order a serial run produces. The extractions come back unvalidated:
+    the parent validates them as it merges (see _add_extraction).
+    """
+    from app.agents.layout_agent import LayoutAgent
+    
+    orchestrator = _worker_orchestrator
+    graph = orchestrator.graph = DocumentGraph(
+        job_id=orchestrator.job_id,
+        pdf_path=orchestrator.pdf_path,
+        pages=orchestrator.graph.pages
+    )
+    orchestrator._pages_needing_camelot = []
+    
+    if orchestrator._needs_layout(graph.pages[page_num]):
+        LayoutAgent.process_page(graph, page_num, orchestrator.pdf_path, _worker_pdf)
+    num_layout_decisions = len(graph.decisions)
+    layout_decisions = graph.decisions.since(0)
+    
+    orchestrator._process_page(page_num)
+    
+    return ((graph.tokens, graph.regions, layout_decisions),
+            (graph.extractions, graph.trace, graph.decisions.since(num_layout_decisions),
+             orchestrator._pages_needing_camelot))
+
 
 class ExpertOrchestrator:
     """
@@ -39,7 +131,28 @@ class ExpertOrchestrator:
     # Retry limits
     MAX_RETRIES = 2
     
-    def __init__(self, pdf_path: str, job_id: str, llm_service: Optional[LLM] = None):
+    # Backoff between attempts when a retry hits a transient error
+    # (rate limits, timeouts, OCR/LLM service hiccups)
+    RETRY_BASE_DELAY = 1.0
+    RETRY_MAX_DELAY = 30.0
+    RETRY_JITTER = 0.5
+    
+    # Ingest gives up on the whole PDF only when more than this share of pages fail
+    MAX_FAILED_PAGE_FRACTION = 0.5
+    
+    # Pages with less native text than this (in characters) go to OCR
+    MIN_NATIVE_TEXT_CHARS = 20
+    
+    # Camelot's lattice mode needs ruled cells, and a table it returns needs
+    # two rows (three horizontal rules and two vertical); pages drawing fewer
+    # straight line segments than this skip the Camelot fallback
+    MIN_RULING_LINES = 5
+    
+    # Error text that marks an exception as transient
+    TRANSIENT_ERROR_MARKERS = ("429", "rate limit", "resource exhausted", "unavailable", "timeout", "timed out")
+    
+    def __init__(self, pdf_path: str, job_id: str, llm_service: Optional[LLM] = None,
+                 parallel: Optional[bool] = None, in_page_worker: bool = False):
         """
         Initialize orchestrator with a PDF.
         
@@ -47,16 +160,66 @@ class ExpertOrchestrator:
             pdf_path: Path to PDF file (local or GCS)
             job_id: Unique job identifier
             llm_service: Optional LLM service for intelligent retry strategy
+            parallel: Process pages in worker processes (defaults to
+                settings.page_workers != 1; False runs everything inline, for debugging)
+            in_page_worker: Set for the orchestrator inside a page worker, which
+                only gates and extracts: it has no LLM client and leaves
+                validation to the parent
         """
         self.pdf_path = pdf_path
         self.job_id = job_id
+        self.parallel = settings.page_workers != 1 if parallel is None else parallel
         self.graph = DocumentGraph(
             job_id=job_id,
             pdf_path=pdf_path
         )
-        self.llm_service = llm_service or LLM() if settings.enable_llm_agents else None
+        use_llm = settings.enable_llm_agents and not in_page_worker
+        self.llm_service = (llm_service or get_llm_service()) if use_llm else None
         self.use_llm = settings.enable_llm_agents and self.llm_service is not None
         
+        # PDF document, open only while _ingest_pdf walks the pages
+        self._pdf_doc = None
+        
+        # Table parses the validator rejected, per original region, so a
+        # retry never hands back a parse that already failed
+        self._local_rejected: Dict[str, set] = {}
+        
+        # (original region ID, attempt) pairs already retried, so a retry
+        # runs at most once even if _handle_retries sees the same failure again
+        self._completed_attempts: Set[Tuple[str, int]] = set()
+        
+        # Failed extraction whose retry is running, so _add_extraction can
+        # give the retry's extractions their lineage before validating them
+        self._retry_parent: Optional[Extraction] = None
+        
+        # Token IDs per page for retry crops (see _page_token_ids)
+        self._token_ids_by_page: Optional[Dict[int, List[int]]] = None
+        
+        # Pages _ingest_pdf couldn't read (recorded and skipped)
+        self._failed_page_count = 0
+        
+        # Pages with no approved table regions, for one Camelot call after
+        # all pages are processed
+        self._pages_needing_camelot: List[int] = []
+        
+        # Created on first use by _validate_one
+        self._validator = None
+        
+        # Accepted extractions awaiting the LLM semantic check, with their
+        # not-yet-recorded decisions (see _check_semantics)
+        self._pending_semantic_checks: List[Tuple[Extraction, AgentDecision]] = []
+        
+        # Page workers leave validation to the parent
+        self._in_page_worker = in_page_worker
+        
+        # Set while _dispatch_batch runs specialists; it validates afterwards
+        self._dispatching = False
+        
+        # Cross-run cache of specialist results (see EXTRACTION_CACHE_DIR);
+        # the PDF fingerprint is computed on first lookup
+        self._extraction_cache = ExtractionCache(settings.extraction_cache_dir) if settings.extraction_cache_dir else None
+        self._pdf_fingerprint: Optional[str] = None
+        
         logger.info(f"ExpertOrchestrator initialized for job {job_id}")
     
     def run(self) -> DocumentGraph:
@@ -73,115 +236,250 @@ class ExpertOrchestrator:
             # Step 1: Ingest PDF
             self._ingest_pdf()
             
-            # Step 2: Process each page
-            for page_num in range(len(self.graph.pages)):
-                self._process_page(page_num)
+            # Step 2: Lay out and process each page (in worker processes when
+            # parallel; extractions are validated as they are produced)
+            self._process_pages()
+            self._extract_tables_with_camelot(self._pages_needing_camelot)
             
-            # Step 3: Validate all extractions
-            self._validate_extractions()
-            
-            # Step 4: Handle retries for failed validations
+            # Step 3: Handle retries for failed validations, then run the
+            # batched LLM checks on everything accepted (retries included)
+            # and, if enabled, name the columns of the tables that passed
             self._handle_retries()
+            self._check_semantics()
+            self._detect_schemas()
             
-            # Step 5: Determine outcome
+            # Step 4: Determine outcome
             self._determine_outcome()
             
             self.graph.status = "completed"
             logger.info(f"Orchestration completed for job {self.job_id}, outcome: {self.graph.outcome}")
-            
+        
         except Exception as e:
             logger.error(f"Orchestration failed for job {self.job_id}: {e}")
             self.graph.status = "failed"
             self.graph.outcome = "FAILED"
+            timestamp = _now_iso()
             self.graph.trace.append({
                 "step": "orchestration",
                 "status": "error",
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
-            })
-            self.graph.decisions.append({
-                "agent": "orchestrator",
-                "timestamp": datetime.now().isoformat(),
-                "decision": "failed",
-                "error": str(e)
+                "timestamp": timestamp
             })
+            self.graph.decisions.record(
+                agent=_AGENT_ORCH,
+                timestamp=timestamp,
+                decision="failed",
+                error=str(e)
+            )
+        finally:
+            self._close_document()
         
         return self.graph
     
+    def _open_document(self):
+        """Return the run's PDF document (see app.services.pdf_backend), opening it on first use"""
+        if self._pdf_doc is None:
+            self._pdf_doc = open_pdf(self.pdf_path)
+        return self._pdf_doc
+    
+    def _close_document(self) -> None:
+        """Release the PDF document (after ingest, or when a run fails)"""
+        if self._pdf_doc is not None:
+            self._pdf_doc.close()
+            self._pdf_doc = None
+    
     def _ingest_pdf(self) -> None:
         """
         Ingest PDF and decide extraction strategy per page.
         
         Decision: PDF native text vs OCR
         """
-        from pypdf import PdfReader
-        
         logger.info(f"Ingesting PDF: {self.pdf_path}")
         
         self.graph.trace.append({
             "step": "ingest_pdf",
             "status": "started",
             "pdf_path": str(self.pdf_path),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         })
         
         try:
-            reader = PdfReader(self.pdf_path)
-            num_pages = len(reader.pages)
+            doc = self._open_document()
+            num_pages = doc.num_pages
+            
+            logger.info(f"PDF has {num_pages} pages (backend: {doc.name})")
             
-            logger.info(f"PDF has {num_pages} pages")
+            # One timestamp for the whole ingest pass; per-page decisions share it
+            timestamp = _now_iso()
             
             self.graph.trace.append({
                 "step": "ingest_pdf",
                 "status": "completed",
                 "pages_found": num_pages,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": timestamp
             })
             
-            # Analyze each page
+            # Analyze each page; a page that fails is skipped, not the whole PDF
             for page_num in range(num_pages):
-                page = reader.pages[page_num]
-                text = page.extract_text()
-                
-                # Decision: use PDF text or fall back to OCR?
-                use_ocr = False
-                reason = "PDF has native text"
-                
-                if not text or len(text.strip()) < 20:
-                    use_ocr = True
-                    reason = "Insufficient native text"
-                
-                # Store page metadata
-                page_info = {
-                    "page_num": page_num,
-                    "width": float(page.mediabox.width),
-                    "height": float(page.mediabox.height),
-                    "use_ocr": use_ocr,
-                    "text_length": len(text) if text else 0
-                }
-                self.graph.pages.append(page_info)
-                
-                # Log decision
-                self.graph.decisions.append({
-                    "agent": "orchestrator",
-                    "page": page_num,
-                    "decision": "use_ocr" if use_ocr else "use_pdf_text",
-                    "reason": reason,
-                    "timestamp": datetime.now().isoformat()
-                })
-                
-                logger.info(f"Page {page_num}: {reason} → {'OCR' if use_ocr else 'PDF text'}")
+                try:
+                    self._ingest_page(doc, page_num, timestamp)
+                except Exception as e:
+                    logger.error(f"Failed to ingest page {page_num}: {e}")
+                    self._failed_page_count += 1
+                    self.graph.pages.append({
+                        "page_num": page_num,
+                        "width": 0.0,
+                        "height": 0.0,
+                        "use_ocr": False,
+                        "text_length": 0,
+                        "ingest_failed": True
+                    })
+                    self.graph.decisions.record(
+                        agent=_AGENT_ORCH,
+                        page=page_num,
+                        decision="page_ingest_failed",
+                        error=str(e),
+                        timestamp=timestamp
+                    )
+            
+            if num_pages and self._failed_page_count / num_pages > self.MAX_FAILED_PAGE_FRACTION:
+                raise RuntimeError(f"Ingest failed on {self._failed_page_count} of {num_pages} pages")
         
         except Exception as e:
             logger.error(f"Failed to ingest PDF: {e}")
             raise
+        finally:
+            # Nothing after ingest reads the document, and layout reopens the
+            # file with pdfplumber; don't carry the parser's state (up to the
+            # whole file, with pypdf) through layout and page processing
+            self._close_document()
+    
+    def _ingest_page(self, doc, page_num: int, timestamp: str) -> None:
+        """Decide native text vs OCR for one page and record it in the graph"""
+        width, height = doc.page_size(page_num)
+        
+        # Decision: use PDF text or fall back to OCR?
+        use_ocr = False
+        reason = _REASON_NATIVE
+        
+        # Scanned pages have no text objects at all; skip the text scan for them
+        if not doc.has_text_layer(page_num):
+            text_length = 0
+            use_ocr = True
+            reason = _REASON_NO_TEXT_LAYER
+        else:
+            # Only whether the page clears the threshold matters here, so the
+            # backend may stop counting early (see text_length)
+            text_length = doc.text_length(page_num, self.MIN_NATIVE_TEXT_CHARS)
+            if text_length < self.MIN_NATIVE_TEXT_CHARS:
+                use_ocr = True
+                reason = _REASON_INSUFFICIENT
+        
+        # Store page metadata
+        page_info = {
+            "page_num": page_num,
+            "width": width,
+            "height": height,
+            "use_ocr": use_ocr,
+            # An estimate, and only a lower bound once it clears the
+            # threshold; not the exact length of the page's text
+            "text_length": text_length
+        }
+        if not use_ocr:
+            page_info["ruling_lines"] = self._ruling_line_count(doc, page_num)
+        self.graph.pages.append(page_info)
+        
+        # Log decision
+        self.graph.decisions.record(
+            agent=_AGENT_ORCH,
+            page=page_num,
+            decision=_DEC_OCR if use_ocr else _DEC_PDF,
+            reason=reason,
+            timestamp=timestamp
+        )
+        
+        logger.info(f"Page {page_num}: {reason} → {'OCR' if use_ocr else 'PDF text'}")
+    
+    @staticmethod
+    def _ruling_line_count(doc, page_num: int) -> Optional[int]:
+        """Line segments drawn on a page, or None if the content can't be read"""
+        try:
+            return doc.ruling_line_count(page_num)
+        except Exception as e:
+            logger.debug(f"Ruling line count failed on page {page_num}: {e}")
+            return None
+    
+    @staticmethod
+    def _needs_layout(page_info: Dict) -> bool:
+        """Whether a page gets layout: native text, and read by ingest"""
+        return not page_info["use_ocr"] and not page_info.get("ingest_failed")
+    
+    def _layout_pages(self) -> None:
+        """Run the Layout Agent on every native-text page, inline"""
+        native_pages = [p["page_num"] for p in self.graph.pages if self._needs_layout(p)]
+        if not native_pages:
+            return
+        
+        # Deferred so OCR-only jobs never load pdfplumber or compile the
+        # numba kernels; after the first job the module is already loaded
+        from app.agents.layout_agent import LayoutAgent
+        
+        LayoutAgent.process_pages(self.graph, native_pages, self.pdf_path, max_workers=1)
+    
+    def _process_pages(self) -> None:
+        """
+        Lay out the native-text pages, then run _process_page for every page.
+        
+        Pages are independent, so in parallel mode each one is laid out and
+        processed whole in a worker (see _process_page_worker), from one pool
+        per job. Results are merged as a serial run produces them: every
+        page's layout first, with token IDs offset into this graph, then each
+        page's processing, with its extractions validated here. With a single
+        page, pages run inline.
+        """
+        page_nums = list(range(len(self.graph.pages)))
+        workers = min(settings.page_workers or os.cpu_count() or 1, len(page_nums))
+        
+        if not self.parallel or workers <= 1:
+            self._layout_pages()
+            for page_num in page_nums:
+                self._process_page(page_num)
+            return
+        
+        from app.agents.layout_agent import LayoutAgent
+        
+        logger.info(f"Processing {len(page_nums)} pages with {workers} workers")
+        
+        # Contiguous page ranges per worker, capped at PAGES_PER_CHUNK
+        chunksize = max(1, min(settings.pages_per_chunk, -(-len(page_nums) // workers)))
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=worker_context(),
+            initializer=_init_page_worker,
+            initargs=(self.pdf_path, self.job_id, self.graph.pages, settings)
+        ) as executor:
+            results = list(executor.map(_process_page_worker, page_nums, chunksize=chunksize))
+        
+        for (tokens, regions, decisions), _ in results:
+            LayoutAgent.merge_page_layout(self.graph, tokens, regions, decisions)
+        
+        # Validate here rather than in the workers, so validator decisions
+        # and pending semantic checks live in this process; a page's decisions
+        # (from the gate) all precede its validations, as in a serial run
+        for _, (extractions, trace, decisions, camelot_pages) in results:
+            self.graph.trace.extend(trace)
+            self.graph.decisions.extend(decisions)
+            for extraction in extractions:
+                self._add_extraction(extraction)
+            self._pages_needing_camelot.extend(camelot_pages)
     
     def _process_page(self, page_num: int) -> None:
         """
         Process a single page through the agent pipeline.
         
         Steps:
-        1. Layout Agent: build tokens + propose regions
+        1. Layout Agent: tokens + proposed regions (done up front, see _process_pages)
         2. For each region: dispatch to specialist
         3. Store extractions in graph
         """
@@ -191,22 +489,23 @@ class ExpertOrchestrator:
             "step": "process_page",
             "status": "started",
             "page_num": page_num,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         })
         
         page_info = self.graph.pages[page_num]
         
+        if page_info.get("ingest_failed"):
+            logger.warning(f"Skipping page {page_num}: ingest failed")
+            return
+        
         # Step 1: Layout Agent
         if page_info["use_ocr"]:
             # TODO: Implement OCR path
             logger.warning(f"Page {page_num} needs OCR - not yet implemented")
             return
         
-        # Process with PDF native text
-        LayoutAgent.process_page(self.graph, page_num, self.pdf_path)
-        
         # Step 1.5: Structure Gate - filter proposed regions
-        page_regions_proposed = [r for r in self.graph.regions if r.page == page_num]
+        page_regions_proposed = self.graph.get_regions_for_page(page_num)
         
         self.graph.trace.append({
             "step": "layout_agent",
@@ -214,7 +513,7 @@ class ExpertOrchestrator:
             "page_num": page_num,
             "regions_proposed": len(page_regions_proposed),
             "region_types": [r.region_type.value for r in page_regions_proposed],
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         })
         
         # Apply structure gate to filter out non-extractable regions
@@ -230,22 +529,39 @@ class ExpertOrchestrator:
             "regions_proposed": len(page_regions_proposed),
             "regions_approved": len(approved_regions),
             "rejection_rate": round(1 - len(approved_regions) / max(len(page_regions_proposed), 1), 2),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         })
         
         # Step 2: Dispatch only approved regions to specialists
-        for region in approved_regions:
-            self._dispatch_to_specialist(region)
+        self._dispatch_batch(approved_regions)
         
         # Fallback: If no table regions approved, try Camelot on full page
+        # (run() does these pages together, in one Camelot call)
         table_regions = [r for r in approved_regions if r.region_type == RegionType.TABLE]
         if not table_regions:
-            logger.info(f"No table regions approved on page {page_num}, trying Camelot fallback")
-            self._extract_tables_with_camelot(page_num)
+            # Lattice tables are drawn with rules; a page without them can't
+            # yield one (None: not counted, so try anyway)
+            ruling_lines = page_info.get("ruling_lines")
+            if ruling_lines is not None and ruling_lines < self.MIN_RULING_LINES:
+                logger.info(f"No table regions approved on page {page_num} and only {ruling_lines} "
+                            f"ruling lines, skipping Camelot fallback")
+            else:
+                logger.info(f"No table regions approved on page {page_num}, queueing Camelot fallback")
+                self._pages_needing_camelot.append(page_num)
     
     def _dispatch_to_specialist(self, region: Region) -> None:
+        """Route a single region to its specialist extractor."""
+        self._dispatch_batch([region])
+    
+    def _dispatch_batch(self, regions: List[Region]) -> None:
         """
-        Route a region to the appropriate specialist extractor.
+        Route regions to the appropriate specialist extractors.
+        
+        Regions are grouped by type and each specialist gets its whole group
+        in one call, so per-call setup is paid once per page, not per region.
+        The extractions and trace entries this adds are then put back in
+        region order, and the extractions validated in that order, so the
+        graph reads as if the regions had been dispatched one at a time.
         
         Specialists:
         - TABLE → Table Agent
@@ -253,119 +569,180 @@ class ExpertOrchestrator:
         - LIST → List Agent
         - TOTALS → Totals Agent
         """
-        logger.info(f"Dispatching {region.region_id} (type: {region.region_type}) to specialist")
+        by_type: Dict[RegionType, List[Region]] = {}
+        for region in regions:
+            by_type.setdefault(region.region_type, []).append(region)
         
-        self.graph.trace.append({
-            "step": "dispatch_to_specialist",
-            "status": "started",
-            "region_id": region.region_id,
-            "region_type": region.region_type.value,
-            "page": region.page,
-            "bbox": {
-                "x": region.bbox.x,
-                "y": region.bbox.y,
-                "w": region.bbox.w,
-                "h": region.bbox.h
-            } if region.bbox else None,
-            "timestamp": datetime.now().isoformat()
-        })
+        num_extractions, num_trace = len(self.graph.extractions), len(self.graph.trace)
+        self._dispatching = True
+        try:
+            self._dispatch_groups(by_type)
+        finally:
+            self._dispatching = False
         
-        # Route based on type
-        if region.region_type == RegionType.TABLE:
-            self._extract_table(region)
-        elif region.region_type == RegionType.KEY_VALUE:
-            self._extract_key_value(region)
-        elif region.region_type == RegionType.LIST:
-            self._extract_list(region)
-        elif region.region_type == RegionType.TOTALS:
-            self._extract_totals(region)
-        elif region.region_type == RegionType.HEADING:
-            # Headings are for structure, not extraction
-            pass
-        else:
-            logger.warning(f"Unknown region type: {region.region_type}")
+        # Back to region order; the sorts are stable, so each region's own
+        # trace entries keep their order
+        position = {region.region_id: i for i, region in enumerate(regions)}
+        self.graph.trace[num_trace:] = sorted(
+            self.graph.trace[num_trace:], key=lambda entry: position.get(entry.get("region_id"), len(regions))
+        )
+        self.graph.extractions[num_extractions:] = sorted(
+            self.graph.extractions[num_extractions:], key=lambda e: position.get(e.region_id, len(regions))
+        )
+        
+        if not self._in_page_worker:
+            for extraction in self.graph.extractions[num_extractions:]:
+                self._validate_one(extraction)
+    
+    def _dispatch_groups(self, by_type: Dict[RegionType, List[Region]]) -> None:
+        """Hand each group of same-type regions to its specialist (see _dispatch_batch)"""
+        for region_type, group in by_type.items():
+            for region in group:
+                logger.info(f"Dispatching {region.region_id} (type: {region.region_type}) to specialist")
+                
+                self.graph.trace.append({
+                    "step": "dispatch_to_specialist",
+                    "status": "started",
+                    "region_id": region.region_id,
+                    "region_type": region.region_type.value,
+                    "page": region.page,
+                    "bbox": {
+                        "x": region.bbox.x,
+                        "y": region.bbox.y,
+                        "w": region.bbox.w,
+                        "h": region.bbox.h
+                    } if region.bbox else None,
+                    "timestamp": _now_iso()
+                })
+            
+            # Route based on type
+            handler = self._DISPATCH.get(region_type)
+            if handler:
+                handler(self, group)
+            else:
+                logger.warning(f"Unknown region type: {region_type}")
     
-    def _extract_table(self, region: Region) -> None:
+    def _extract_tables(self, regions: List[Region]) -> None:
         """
-        Extract structured table from region.
+        Extract structured tables from regions.
         Calls Table Agent.
         """
         from app.agents.table_agent import TableAgent
         
-        logger.info(f"Table extraction for {region.region_id}")
+        logger.info(f"Table extraction for {len(regions)} regions")
         
-        extraction = TableAgent.extract_table(self.graph, region)
-        if extraction:
-            self.graph.add_extraction(extraction)
-            self.graph.trace.append({
-                "step": "table_extraction",
-                "status": "success",
-                "region_id": region.region_id,
-                "rows_extracted": len(extraction.data.get('rows', [])),
-                "confidence": extraction.confidence,
-                "timestamp": datetime.now().isoformat()
-            })
-        else:
-            logger.warning(f"TableAgent returned no extraction for {region.region_id}")
-            self.graph.trace.append({
-                "step": "table_extraction",
-                "status": "failed",
-                "region_id": region.region_id,
-                "reason": "TableAgent returned None",
-                "timestamp": datetime.now().isoformat()
-            })
+        # Serve unchanged regions from the cache; retries depend on the
+        # rejection context in their hints, so they always re-extract
+        cache_keys: Dict[str, str] = {}
+        extractions: Dict[str, Optional[Extraction]] = {}
+        if self._extraction_cache:
+            for region in regions:
+                if "retry_of" in region.hints:
+                    continue
+                key = self._cache_key(region, TableAgent.EXTRACTOR_VERSION)
+                cache_keys[region.region_id] = key
+                cached = self._extraction_cache.get(key, region.region_id)
+                if cached:
+                    logger.info(f"Extraction cache hit for {region.region_id}")
+                    extractions[region.region_id] = cached
+        
+        misses = [r for r in regions if r.region_id not in extractions]
+        for region, extraction in zip(misses, TableAgent.extract_batch(self.graph, misses)):
+            extractions[region.region_id] = extraction
+            if extraction and region.region_id in cache_keys:
+                self._extraction_cache.put(cache_keys[region.region_id], extraction)
+        
+        for region in regions:
+            extraction = extractions[region.region_id]
+            if extraction:
+                self._add_extraction(extraction)
+                self.graph.trace.append({
+                    "step": "table_extraction",
+                    "status": "success",
+                    "region_id": region.region_id,
+                    "rows_extracted": len(extraction.data.get('rows', [])),
+                    "confidence": extraction.confidence,
+                    "timestamp": _now_iso()
+                })
+            else:
+                logger.warning(f"TableAgent returned no extraction for {region.region_id}")
+                self.graph.trace.append({
+                    "step": "table_extraction",
+                    "status": "failed",
+                    "region_id": region.region_id,
+                    "reason": "TableAgent returned None",
+                    "timestamp": _now_iso()
+                })
     
-    def _extract_key_value(self, region: Region) -> None:
+    def _extract_key_values(self, regions: List[Region]) -> None:
         """Extract key-value pairs (invoice details, etc.)"""
-        logger.info(f"Key-value extraction for {region.region_id} - placeholder")
-        
-        extraction = Extraction(
-            extraction_id=f"ext_{region.region_id}",
-            region_id=region.region_id,
-            data={"pairs": []},
-            confidence=0.0,
-            validation_status=ValidationStatus.PENDING,
-            extracted_by="kv_agent_placeholder"
-        )
-        self.graph.add_extraction(extraction)
+        for region in regions:
+            logger.info(f"Key-value extraction for {region.region_id} - placeholder")
+            
+            extraction = Extraction(
+                extraction_id=f"ext_{region.region_id}",
+                region_id=region.region_id,
+                data={"pairs": []},
+                confidence=0.0,
+                validation_status=ValidationStatus.PENDING,
+                extracted_by="kv_agent_placeholder"
+            )
+            self._add_extraction(extraction)
     
-    def _extract_list(self, region: Region) -> None:
+    def _extract_lists(self, regions: List[Region]) -> None:
         """Extract list items"""
-        logger.info(f"List extraction for {region.region_id} - placeholder")
-        
-        extraction = Extraction(
-            extraction_id=f"ext_{region.region_id}",
-            region_id=region.region_id,
-            data={"items": []},
-            confidence=0.0,
-            validation_status=ValidationStatus.PENDING,
-            extracted_by="list_agent_placeholder"
-        )
-        self.graph.add_extraction(extraction)
+        for region in regions:
+            logger.info(f"List extraction for {region.region_id} - placeholder")
+            
+            extraction = Extraction(
+                extraction_id=f"ext_{region.region_id}",
+                region_id=region.region_id,
+                data={"items": []},
+                confidence=0.0,
+                validation_status=ValidationStatus.PENDING,
+                extracted_by="list_agent_placeholder"
+            )
+            self._add_extraction(extraction)
     
-    def _extract_totals(self, region: Region) -> None:
-        """Extract totals/summary section"""
-        logger.info(f"Totals extraction for {region.region_id} - placeholder")
-        
-        extraction = Extraction(
-            extraction_id=f"ext_{region.region_id}",
-            region_id=region.region_id,
-            data={"totals": {}},
-            confidence=0.0,
-            validation_status=ValidationStatus.PENDING,
-            extracted_by="totals_agent_placeholder"
-        )
-        self.graph.add_extraction(extraction)
+    def _extract_totals(self, regions: List[Region]) -> None:
+        """Extract totals/summary sections"""
+        for region in regions:
+            logger.info(f"Totals extraction for {region.region_id} - placeholder")
+            
+            extraction = Extraction(
+                extraction_id=f"ext_{region.region_id}",
+                region_id=region.region_id,
+                data={"totals": {}},
+                confidence=0.0,
+                validation_status=ValidationStatus.PENDING,
+                extracted_by="totals_agent_placeholder"
+            )
+            self._add_extraction(extraction)
     
-    def _extract_tables_with_camelot(self, page_num: int) -> None:
+    # Batch specialist per region type, looked up by _dispatch_batch
+    _DISPATCH = {
+        RegionType.TABLE: _extract_tables,
+        RegionType.KEY_VALUE: _extract_key_values,
+        RegionType.LIST: _extract_lists,
+        RegionType.TOTALS: _extract_totals,
+        RegionType.HEADING: lambda self, regions: None,  # Headings are for structure, not extraction
+    }
+    
+    def _extract_tables_with_camelot(self, page_nums: List[int]) -> None:
         """
-        Fallback: Use Camelot to extract tables from full page.
-        Called when LayoutAgent doesn't detect any table regions.
+        Fallback: Use Camelot to extract tables from full pages.
+        Called for pages where LayoutAgent doesn't detect any table regions.
+        
+        All pages go to one read_pdf call, so Camelot opens and splits the
+        PDF once rather than once per page. If that call fails, the pages are
+        tried one at a time, so one bad page doesn't cost the others' tables.
         """
+        if not page_nums:
+            return
+        
         import camelot
-        import os
         
-        logger.info(f"Using Camelot fallback for page {page_num}")
+        logger.info(f"Using Camelot fallback for {len(page_nums)} pages")
         
         # Ensure Ghostscript is in PATH for this subprocess
         original_path = os.environ.get("PATH", "")
@@ -374,58 +751,107 @@ class ExpertOrchestrator:
             gs_paths = ["/opt/homebrew/bin", "/usr/local/bin", "/usr/bin"]
             os.environ["PATH"] = ":".join(gs_paths) + ":" + original_path
             
-            # Camelot uses 1-indexed pages
-            tables = camelot.read_pdf(
-                self.pdf_path,
-                pages=str(page_num + 1),
-                flavor='lattice',
-                strip_text='\n'
-            )
+            try:
+                tables = self._read_camelot_tables(camelot, page_nums)
+            except Exception as e:
+                if "Ghostscript" in str(e) or len(page_nums) == 1:
+                    self._log_camelot_failure(page_nums, e)
+                    return
+                logger.warning(f"Camelot fallback failed for pages {page_nums}: {e}; trying each page alone")
+                tables = []
+                for page_num in sorted(page_nums):
+                    try:
+                        tables.extend(self._read_camelot_tables(camelot, [page_num]))
+                    except Exception as page_error:
+                        self._log_camelot_failure([page_num], page_error)
             
             if not tables:
-                logger.info(f"Camelot found no tables on page {page_num}")
+                logger.info(f"Camelot found no tables on pages {page_nums}")
                 return
             
-            # Process each table found
-            for table_idx, table in enumerate(tables):
-                # Convert to list of rows
-                rows = []
-                for row in table.df.values.tolist():
-                    # Filter empty cells
-                    cleaned_row = [str(cell).strip() for cell in row if str(cell).strip()]
-                    if cleaned_row:
-                        rows.append(cleaned_row)
-                
-                if len(rows) < 2:
-                    continue
-                
-                # Create extraction
-                extraction = Extraction(
-                    extraction_id=f"camelot_p{page_num}_t{table_idx}",
-                    region_id=f"camelot_region_p{page_num}_t{table_idx}",
-                    data={"rows": rows, "columns": len(rows[0]) if rows else 0},
-                    confidence=0.85,
-                    validation_status=ValidationStatus.PENDING,
-                    extracted_by="camelot_fallback",
-                    method=ExtractionMethod.AGENT_INFERRED
-                )
-                self.graph.add_extraction(extraction)
-                logger.info(f"Camelot extracted {len(rows)} rows from page {page_num} table {table_idx}")
+            # Tables come back in page order; number them within their page
+            tables_by_page: Dict[int, list] = {}
+            for table in tables:
+                tables_by_page.setdefault(int(table.page) - 1, []).append(table)
+            
+            for page_num, page_tables in tables_by_page.items():
+                for table_idx, table in enumerate(page_tables):
+                    # Convert to list of rows
+                    rows = []
+                    for row in table.df.values.tolist():
+                        # Filter empty cells (stripping each cell once)
+                        cleaned_row = [text for cell in row if (text := str(cell).strip())]
+                        if cleaned_row:
+                            rows.append(cleaned_row)
+                    
+                    if len(rows) < 2:
+                        continue
+                    
+                    # Create extraction
+                    extraction = Extraction(
+                        extraction_id=f"camelot_p{page_num}_t{table_idx}",
+                        region_id=f"camelot_region_p{page_num}_t{table_idx}",
+                        data={"rows": rows, "columns": len(rows[0]) if rows else 0},
+                        confidence=0.85,
+                        validation_status=ValidationStatus.PENDING,
+                        extracted_by="camelot_fallback",
+                        method=ExtractionMethod.AGENT_INFERRED
+                    )
+                    self._add_extraction(extraction)
+                    logger.info(f"Camelot extracted {len(rows)} rows from page {page_num} table {table_idx}")
         
         except Exception as e:
-            if "Ghostscript" in str(e):
-                logger.warning(f"Camelot requires Ghostscript for table extraction on page {page_num}. "
-                             f"Install via: brew install ghostscript (macOS) or apt-get install ghostscript (Linux). "
-                             f"Falling back to Document AI for tables.")
-            else:
-                logger.error(f"Camelot fallback failed for page {page_num}: {e}")
+            self._log_camelot_failure(page_nums, e)
         finally:
             # Restore original PATH
             os.environ["PATH"] = original_path
     
-    def _validate_extractions(self) -> None:
+    def _read_camelot_tables(self, camelot, page_nums: List[int]) -> list:
+        """Lattice tables Camelot finds on the given pages, in one read_pdf call"""
+        # Camelot uses 1-indexed pages
+        return list(camelot.read_pdf(
+            self.pdf_path,
+            pages=",".join(str(page_num + 1) for page_num in sorted(page_nums)),
+            flavor='lattice',
+            strip_text='\n'
+        ))
+    
+    @staticmethod
+    def _log_camelot_failure(page_nums: List[int], error: Exception) -> None:
+        """Log why the Camelot fallback failed on some pages"""
+        if "Ghostscript" in str(error):
+            logger.warning(f"Camelot requires Ghostscript for table extraction on pages {page_nums}. "
+                         f"Install via: brew install ghostscript (macOS) or apt-get install ghostscript (Linux). "
+                         f"Falling back to Document AI for tables.")
+        else:
+            logger.error(f"Camelot fallback failed for pages {page_nums}: {error}")
+    
+    def _cache_key(self, region: Region, extractor_version: int) -> str:
+        """Extraction cache key for a region of this job's PDF"""
+        if self._pdf_fingerprint is None:
+            self._pdf_fingerprint = pdf_fingerprint(self.pdf_path)
+        return ExtractionCache.make_key(self._pdf_fingerprint, region, extractor_version)
+    
+    def _add_extraction(self, extraction: Extraction) -> None:
+        """
+        Add an extraction to the graph and validate it straight away.
+        
+        During a retry it first gets the retry's attempt number and parent,
+        so validation and the decision log see it as a retry. During
+        dispatch, _dispatch_batch validates it once the batch is back in
+        region order. In a page worker it is only added; the parent
+        validates it when it merges the page (see _process_pages).
+        """
+        if self._retry_parent is not None:
+            extraction.attempt = self._retry_parent.attempt + 1
+            extraction.parent_extraction_id = self._retry_parent.extraction_id
+        self.graph.add_extraction(extraction)
+        if not self._in_page_worker and not self._dispatching:
+            self._validate_one(extraction)
+    
+    def _validate_one(self, extraction: Extraction) -> None:
         """
-        Run validators on all extractions using ValidatorAgent.
+        Run ValidatorAgent on one extraction and record its decision.
         
         Checks:
         - Totals match sums
@@ -433,26 +859,95 @@ class ExpertOrchestrator:
         - Types parse cleanly
         - "Total ..." lines not mistaken as data rows
         """
-        from app.agents.validator_agent import ValidatorAgent
+        if self._validator is None:
+            from app.agents.validator_agent import ValidatorAgent
+            self._validator = ValidatorAgent(llm_service=self.llm_service)
         
-        logger.info("Validating all extractions")
+        decision = self._validator.validate_extraction(self.graph, extraction, check_semantics=False)
         
-        # Create validator instance
-        validator = ValidatorAgent(llm_service=self.llm_service)
+        # The semantic check can only downgrade an accepted extraction, never
+        # fail it, so it doesn't affect retries: batch it (see _check_semantics)
+        if self._validator.use_llm and decision.action == AgentDecision.Action.ACCEPT:
+            self._pending_semantic_checks.append((extraction, decision))
+            return
         
-        for extraction in self.graph.extractions:
-            decision = validator.validate_extraction(self.graph, extraction)
-            
-            self.graph.decisions.append({
-                "agent": "validator",
-                "extraction_id": extraction.extraction_id,
-                "decision": decision.action.value,
-                "confidence": decision.confidence,
-                "explanation": decision.explanation,
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            logger.info(f"Validated {extraction.extraction_id}: {extraction.validation_status} (conf={extraction.confidence:.2f})")
+        self._record_validation(extraction, decision)
+    
+    def _record_validation(self, extraction: Extraction, decision: AgentDecision) -> None:
+        """Log the validator's decision on an extraction"""
+        self.graph.decisions.record(
+            agent="validator",
+            extraction_id=extraction.extraction_id,
+            decision=decision.action.value,
+            confidence=decision.confidence,
+            explanation=decision.explanation,
+            timestamp=_now_iso()
+        )
+        
+        logger.info(f"Validated {extraction.extraction_id}: {extraction.validation_status} (conf={extraction.confidence:.2f})")
+    
+    def _validate_extractions(self) -> None:
+        """
+        Validate every extraction still pending.
+        
+        run() validates inline as extractions are added; this catches any
+        added to the graph directly (e.g. a graph resumed from storage).
+        """
+        pending = self.graph.extractions_by_status().get(ValidationStatus.PENDING, [])
+        logger.info(f"Validating {len(pending)} pending extractions")
+        
+        for extraction in pending:
+            self._validate_one(extraction)
+        self._check_semantics()
+    
+    def _check_semantics(self) -> None:
+        """
+        Run the LLM semantic check on every extraction _validate_one accepted.
+        
+        The calls go out concurrently (ValidatorAgent.check_semantics_many)
+        instead of one round trip per extraction during page processing.
+        """
+        pending, self._pending_semantic_checks = self._pending_semantic_checks, []
+        if not pending:
+            return
+        
+        logger.info(f"Checking semantics of {len(pending)} accepted extractions")
+        results = self._validator.check_semantics_many(
+            self.graph,
+            [extraction for extraction, _ in pending],
+            max_concurrency=settings.llm_concurrency
+        )
+        
+        for (extraction, decision), result in zip(pending, results):
+            self._validator.apply_semantic_result(extraction, decision, result)
+            self._record_validation(extraction, decision)
+    
+    def _detect_schemas(self) -> None:
+        """
+        Name the columns of every passed table with the Schema Agent.
+        
+        Off unless settings.enable_schema_detection is set: it costs an LLM
+        call per table and replaces the column names the extractor found.
+        The tables go to the LLM as one concurrent batch
+        (SchemaAgent.enrich_extractions_with_schema), after the semantic
+        checks so tables that failed them don't cost a call. Without a
+        configured model the agent's fallback would only number the columns,
+        so the tables keep their own headers.
+        """
+        if not settings.enable_schema_detection:
+            return
+        if not self.use_llm or not self.llm_service.is_available():
+            return
+        
+        tables = [e for e in self.graph.extractions_by_status().get(ValidationStatus.PASS, [])
+                  if "rows" in e.data]
+        if not tables:
+            return
+        
+        from app.agents.schema_agent import SchemaAgent
+        
+        logger.info(f"Detecting schemas of {len(tables)} tables")
+        SchemaAgent.enrich_extractions_with_schema(tables, llm_service=self.llm_service)
     
     def _handle_retries(self) -> None:
         """
@@ -463,46 +958,121 @@ class ExpertOrchestrator:
         - RETRY_OCR: force OCR instead of PDF text
         - RETRY_HIGHER_DPI: increase OCR resolution
         """
-        failed = [e for e in self.graph.extractions 
-                 if e.validation_status == ValidationStatus.FAIL]
+        failed = self.graph.extractions_by_status().get(ValidationStatus.FAIL, [])
         
         if not failed:
             logger.info("No failed extractions, skipping retries")
             return
         
         logger.info(f"Handling {len(failed)} failed extractions")
+        timestamp = _now_iso()
+        
+        # Retries already in the graph (e.g. a resumed job) count as done
+        for extraction in self.graph.extractions:
+            if extraction.attempt > 0:
+                self._completed_attempts.add((self._original_region_id(extraction.region_id), extraction.attempt))
         
         for extraction in failed:
-            if extraction.extraction_id.endswith("_retry"):
+            if extraction.attempt >= self.MAX_RETRIES:
                 logger.warning(f"Already retried {extraction.extraction_id}, escalating")
                 extraction.validation_status = ValidationStatus.WARNING
                 continue
             
+            attempt_key = (self._original_region_id(extraction.region_id), extraction.attempt + 1)
+            if attempt_key in self._completed_attempts:
+                logger.info(f"Attempt {attempt_key[1]} for {attempt_key[0]} already ran, skipping")
+                continue
+            
             # Decide retry strategy
             decision = self._decide_retry_strategy(extraction)
             
+            # Tell the next attempt why this one was rejected, so it doesn't
+            # reproduce the same failure
+            decision.next_params.setdefault("prior_errors", list(extraction.validation_errors))
+            decision.next_params.setdefault("rejected_values", [extraction.data])
+            
             logger.info(f"Retry decision for {extraction.extraction_id}: {decision.action.value}")
             
-            self.graph.decisions.append({
-                "agent": "orchestrator",
-                "extraction_id": extraction.extraction_id,
-                "decision": decision.action.value,
-                "confidence": decision.confidence,
-                "explanation": decision.explanation,
-                "timestamp": datetime.now().isoformat()
-            })
+            self.graph.decisions.record(
+                agent=_AGENT_ORCH,
+                extraction_id=extraction.extraction_id,
+                decision=decision.action.value,
+                confidence=decision.confidence,
+                explanation=decision.explanation,
+                timestamp=timestamp
+            )
             
             # Actually execute the retry
-            if decision.action == AgentDecision.Action.RETRY_PAD:
-                self._retry_with_padding(extraction, decision.next_params)
-            elif decision.action == AgentDecision.Action.RETRY_OCR:
-                self._retry_with_ocr(extraction, decision.next_params)
-            elif decision.action == AgentDecision.Action.RETRY_HIGHER_DPI:
-                self._retry_with_higher_dpi(extraction, decision.next_params)
+            self._execute_retry(extraction, decision)
+            self._completed_attempts.add(attempt_key)
+    
+    def _original_region_id(self, region_id: str) -> str:
+        """ID of the region a (possibly retried) region was first proposed as"""
+        region = self.graph.get_region(region_id)
+        return region.hints.get("retry_of", region_id) if region else region_id
+    
+    def _execute_retry(self, extraction: Extraction, decision: AgentDecision) -> None:
+        """
+        Run a retry strategy, backing off and trying again on transient errors.
+        
+        Validation failures are deterministic, so the first retry runs
+        immediately. Only exceptions that look transient (see _is_transient)
+        are retried, after an exponential delay with jitter so concurrent
+        jobs don't hit a congested service in lockstep. Anything else is raised.
+        """
+        handlers = {
+            AgentDecision.Action.RETRY_PAD: self._retry_with_padding,
+            AgentDecision.Action.RETRY_OCR: self._retry_with_ocr,
+            AgentDecision.Action.RETRY_HIGHER_DPI: self._retry_with_higher_dpi,
+        }
+        handler = handlers.get(decision.action)
+        if handler is None:
+            return
+        
+        # Extractions this retry produces get the next attempt number (see _add_extraction)
+        self._retry_parent = extraction
+        try:
+            for backoff_attempt in range(self.MAX_RETRIES + 1):
+                try:
+                    handler(extraction, decision.next_params)
+                    break
+                except Exception as e:
+                    if not self._is_transient(e) or backoff_attempt == self.MAX_RETRIES:
+                        raise
+                    delay = self._backoff_delay(backoff_attempt)
+                    logger.warning(f"Transient error retrying {extraction.extraction_id}: {e}; "
+                                   f"trying again in {delay:.1f}s")
+                    self.graph.decisions.record(
+                        agent=_AGENT_ORCH,
+                        extraction_id=extraction.extraction_id,
+                        decision="retry_backoff",
+                        explanation=f"Waiting {delay:.2f}s before {decision.action.value} try {backoff_attempt + 2}",
+                        error=str(e),
+                        timestamp=_now_iso()
+                    )
+                    time.sleep(delay)
+        finally:
+            self._retry_parent = None
+    
+    @classmethod
+    def _is_transient(cls, error: Exception) -> bool:
+        """Whether an error is worth retrying after a delay (vs. unrecoverable)"""
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        message = str(error).lower()
+        return any(marker in message for marker in cls.TRANSIENT_ERROR_MARKERS)
+    
+    @classmethod
+    def _backoff_delay(cls, attempt: int) -> float:
+        """Exponential backoff with jitter: base * 2^attempt * (1 + U(0, jitter)), capped"""
+        delay = cls.RETRY_BASE_DELAY * 2 ** attempt * (1 + random.uniform(0, cls.RETRY_JITTER))
+        return min(delay, cls.RETRY_MAX_DELAY)
     
     def _retry_with_padding(self, extraction: Extraction, params: Dict) -> None:
         """Re-extract region with expanded bounding box."""
-        region = next((r for r in self.graph.regions if r.region_id == extraction.region_id), None)
+        from app.agents.table_agent import TableAgent
+        
+        region = self.graph.get_region(extraction.region_id)
         if not region:
             logger.error(f"Region {extraction.region_id} not found for retry")
             return
@@ -518,13 +1088,30 @@ class ExpertOrchestrator:
             h=min(1.0, region.bbox.h + 2 * pad_fraction)
         )
         
+        # Rejections accumulate across attempts on the same original region
+        original_id = region.hints.get("retry_of", region.region_id)
+        rejected = self._local_rejected.setdefault(original_id, set())
+        for value in params.get("rejected_values", []):
+            if "rows" in value:
+                rejected.add(TableAgent.table_fingerprint(value["rows"]))
+        
+        # Not pooled: the padded region and its extraction stay in the graph
+        # as the retry's audit trail, so there's nothing to hand back for reuse
         padded_region = Region(
-            region_id=f"{region.region_id}_retry",
+            region_id=f"{original_id}#a{extraction.attempt + 1}",
             region_type=region.region_type,
             bbox=padded_bbox,
             page=region.page,
+            token_ids=self._token_ids_in_bbox(region.page, padded_bbox),
             confidence=region.confidence,
-            source_agent="orchestrator_retry"
+            detected_by="orchestrator_retry",
+            hints={
+                "retry_of": original_id,
+                "prior_errors": list(params.get("prior_errors", [])),
+                # A sorted copy: JSON-serializable, and later attempts adding
+                # to the set don't change what this attempt was given
+                "rejected_fingerprints": sorted(rejected)
+            }
         )
         
         # Mark original as superseded
@@ -535,6 +1122,26 @@ class ExpertOrchestrator:
         self.graph.add_region(padded_region)
         self._dispatch_to_specialist(padded_region)
     
+    def _token_ids_in_bbox(self, page_num: int, bbox: BBox) -> List[int]:
+        """IDs of tokens on a page whose bbox lies inside the given bbox"""
+        tokens = self.graph.tokens
+        return [token_id for token_id in self._page_token_ids(page_num)
+                if bbox.contains(tokens[token_id].bbox)]
+    
+    def _page_token_ids(self, page_num: int) -> List[int]:
+        """
+        IDs of a page's tokens.
+        
+        Tokens are all added by layout, before any retry, so the grouping is
+        built once on the first retry and each later one only looks at its
+        own page instead of every token in the document.
+        """
+        if self._token_ids_by_page is None:
+            self._token_ids_by_page = {}
+            for token_id, token in enumerate(self.graph.tokens):
+                self._token_ids_by_page.setdefault(token.page, []).append(token_id)
+        return self._token_ids_by_page.get(page_num, [])
+    
     def _retry_with_ocr(self, extraction: Extraction, params: Dict) -> None:
         """Re-extract region using OCR instead of native text."""
         logger.info(f"OCR retry not yet implemented for {extraction.extraction_id}")
@@ -592,6 +1199,7 @@ class ExpertOrchestrator:
             )
         
         # If validation errors mention missing data, try OCR
+        # (str.lower + `in` measured ~4x faster than an IGNORECASE regex here)
         if any("missing" in err.lower() for err in extraction.validation_errors):
             return AgentDecision(
                 action=AgentDecision.Action.RETRY_OCR,
@@ -630,7 +1238,7 @@ class ExpertOrchestrator:
                        f"{diagnosis.get('root_cause', 'unknown')}")
             
             return diagnosis
-            
+        
         except Exception as e:
             logger.error(f"LLM diagnosis failed: {e}", exc_info=True)
             return None
@@ -647,8 +1255,9 @@ class ExpertOrchestrator:
         # Count approved regions from trace
         regions_approved = sum(t.get("regions_approved", 0) for t in self.graph.trace if t.get("step") == "structure_gate")
         extractions_count = len(self.graph.extractions)
-        passed = [e for e in self.graph.extractions if e.validation_status.name == "PASS"]
-        failed = [e for e in self.graph.extractions if e.validation_status.name == "FAIL"]
+        by_status = self.graph.extractions_by_status()
+        passed = by_status.get(ValidationStatus.PASS, [])
+        failed = by_status.get(ValidationStatus.FAIL, [])
         
         # HARD LOG: Outcome determination inputs
         logger.info(f"Determining outcome: {regions_proposed} proposed, {regions_approved} approved, {extractions_count} extractions, {len(passed)} passed")
@@ -662,7 +1271,7 @@ class ExpertOrchestrator:
                 "reason": "Structure gate rejected all proposed regions",
                 "regions_proposed": regions_proposed,
                 "regions_approved": 0,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
         elif len(passed) == 0:
             # Regions found but all extractions failed
@@ -674,7 +1283,7 @@ class ExpertOrchestrator:
                 "regions_proposed": regions_proposed,
                 "regions_approved": regions_approved,
                 "extractions_attempted": extractions_count,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
         elif len(failed) > 0:
             # Some passed, some failed
@@ -684,7 +1293,7 @@ class ExpertOrchestrator:
                 "status": "partial_success",
                 "passed": len(passed),
                 "failed": len(failed),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
         else:
             # All passed
@@ -693,5 +1302,5 @@ class ExpertOrchestrator:
                 "step": "determine_outcome",
                 "status": "success",
                 "extractions": len(passed),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
@@ -3,10 +3,13 @@ Schema Agent: Uses LLM to detect column meanings and data types.
 
 This agent is TRULY AGENTIC - it uses LLM reasoning instead of rules.
 """
+import asyncio
 import logging
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from app.models.document_graph import Extraction
-from app.services.llm import LLM
+from app.services.llm import LLM, get_llm_service
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +32,55 @@ class SchemaAgent:
         Returns:
             Schema dict with column meanings, types, and metadata
         """
+        table_data = SchemaAgent._table_rows(extraction)
+        if table_data is None:
+            return None
+        
+        # Call LLM for schema understanding
+        llm = get_llm_service()
+        schema_result = llm.detect_table_schema(
+            table_data=table_data,
+            context=context or {}
+        )
+        
+        return SchemaAgent._build_schema(table_data, schema_result)
+    
+    @staticmethod
+    async def detect_schema_many(extractions: List[Extraction], context: Dict = None,
+                                 llm_service: Optional[LLM] = None) -> List[Optional[Dict]]:
+        """
+        detect_schema for many extractions, with the LLM calls overlapped.
+        
+        Each call is mostly waiting on the network, so running them
+        concurrently (at most settings.llm_concurrency at a time) takes
+        roughly one round trip instead of one per table.
+        
+        Args:
+            llm_service: LLM client to use (defaults to the shared one)
+        
+        Returns:
+            Schema dict (or None) per extraction, in the same order
+        """
+        llm = llm_service or get_llm_service()
+        semaphore = asyncio.Semaphore(get_settings().llm_concurrency)
+        
+        async def detect_one(extraction: Extraction) -> Optional[Dict]:
+            table_data = SchemaAgent._table_rows(extraction)
+            if table_data is None:
+                return None
+            
+            async with semaphore:
+                schema_result = await llm.detect_table_schema_async(
+                    table_data=table_data,
+                    context=context or {}
+                )
+            return SchemaAgent._build_schema(table_data, schema_result)
+        
+        return await asyncio.gather(*(detect_one(e) for e in extractions))
+    
+    @staticmethod
+    def _table_rows(extraction: Extraction) -> Optional[List[List[str]]]:
+        """Table rows to detect a schema for, or None if there aren't enough"""
         if not extraction.data or "rows" not in extraction.data:
             logger.warning("No table data in extraction %s", extraction.extraction_id)
             return None
@@ -37,17 +89,14 @@ class SchemaAgent:
         if len(table_data) < 2:
             logger.warning("Not enough rows for schema detection: %s", len(table_data))
             return None
-
+        
         logger.info("Detecting schema for %s (%s rows × %s cols)", 
                    extraction.extraction_id, len(table_data), len(table_data[0]))
-
-        # Call LLM for schema understanding
-        llm = LLM()
-        schema_result = llm.detect_table_schema(
-            table_data=table_data,
-            context=context or {}
-        )
-        
+        return table_data
+    
+    @staticmethod
+    def _build_schema(table_data: List[List[str]], schema_result: Dict) -> Dict:
+        """Structured schema from the LLM's answer"""
         # Build structured schema
         schema = {
             "columns": schema_result["columns"],
@@ -78,7 +127,35 @@ class SchemaAgent:
             Same extraction with schema field populated
         """
         schema = SchemaAgent.detect_schema(extraction, context)
+        SchemaAgent._apply_schema(extraction, schema)
+        return extraction
+    
+    @staticmethod
+    def enrich_extractions_with_schema(extractions: List[Extraction], context: Dict = None,
+                                       llm_service: Optional[LLM] = None) -> List[Extraction]:
+        """
+        enrich_extraction_with_schema for many extractions, with the LLM
+        calls running concurrently (see detect_schema_many).
+        """
+        batch = SchemaAgent.detect_schema_many(extractions, context, llm_service)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            schemas = asyncio.run(batch)
+        else:
+            # Already inside an event loop (the API runs the orchestrator in
+            # its request handler), where asyncio.run can't nest: give the
+            # batch its own loop on a worker thread
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                schemas = pool.submit(asyncio.run, batch).result()
         
+        for extraction, schema in zip(extractions, schemas):
+            SchemaAgent._apply_schema(extraction, schema)
+        return extractions
+    
+    @staticmethod
+    def _apply_schema(extraction: Extraction, schema: Optional[Dict]) -> None:
+        """Store a detected schema on an extraction and rename its columns"""
         if schema:
             extraction.schema = schema
             # Update column names in data
@@ -86,5 +163,3 @@ class SchemaAgent:
                 extraction.data["columns"] = [c["name"] for c in schema["columns"]]
             
             logger.info("Enriched %s with schema", extraction.extraction_id)
-        
-        return extraction
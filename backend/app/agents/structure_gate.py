@@ -16,12 +16,31 @@ import logging
 from typing import List, Optional, Dict, Tuple
 from collections import defaultdict
 
+import numpy as np
+
 from app.models.document_graph import (
     DocumentGraph, Region, Token, RegionType, TokenType, BBox
 )
+from app.utils.clustering import cluster_sorted
 
 logger = logging.getLogger(__name__)
 
+# Token types that count as data for the data-ratio bonus
+_DATA_TOKEN_TYPES = frozenset((
+    TokenType.DATE, TokenType.CURRENCY, TokenType.DATA_VOLUME,
+    TokenType.DURATION, TokenType.TIME, TokenType.NUMBER
+))
+
+
+def _upper_median(values: List[float]) -> float:
+    """
+    Upper median by selection in O(n).
+    
+    Same value as sorted(values)[len(values) // 2], without the full sort.
+    """
+    mid = len(values) // 2
+    return float(np.partition(np.asarray(values, dtype=np.float64), mid)[mid])
+
 
 class StructureGate:
     """
@@ -56,7 +75,7 @@ class StructureGate:
         logger.info(f"Structure gate filtering page {page_num}")
         
         # Get all proposed regions for this page
-        proposed = [r for r in graph.regions if r.page == page_num]
+        proposed = graph.get_regions_for_page(page_num)
         
         if not proposed:
             logger.info(f"No proposed regions on page {page_num}")
@@ -64,6 +83,8 @@ class StructureGate:
         
         approved = []
         rejected = []
+        all_tokens = graph.tokens
+        num_tokens = len(all_tokens)
         
         for region in proposed:
             # Skip headings - they pass through without filtering
@@ -72,33 +93,37 @@ class StructureGate:
                 continue
             
             # Get tokens for this region
-            tokens = [graph.tokens[tid] for tid in region.token_ids if tid < len(graph.tokens)]
+            tokens = [all_tokens[tid] for tid in region.token_ids if tid < num_tokens]
             
             if not tokens:
                 rejected.append((region, "no_tokens"))
                 continue
             
-            # Run structure checks
+            # Run structure checks. These stay on Token lists: proposed regions
+            # are small (median 3 tokens, largest 27 on the sample bills) and
+            # building NumPy arrays per region measured ~2.6x slower
             score, reasons = StructureGate._score_extractability(tokens, region)
             
             if score >= 0.6:  # Threshold for approval
                 approved.append(region)
-                logger.info(f"✓ Region {region.region_id}: score={score:.2f}, reasons={reasons}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"✓ Region {region.region_id}: score={score:.2f}, reasons={reasons}")
             else:
                 rejected.append((region, f"low_score={score:.2f}, {reasons}"))
-                logger.info(f"✗ Region {region.region_id}: score={score:.2f}, reasons={reasons}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"✗ Region {region.region_id}: score={score:.2f}, reasons={reasons}")
         
         logger.info(f"Structure gate: {len(approved)}/{len(proposed)} regions approved, {len(rejected)} rejected")
         
         # Log rejection reasons for debugging
         for region, reason in rejected:
-            graph.decisions.append({
-                "agent": "structure_gate",
-                "page": page_num,
-                "region_id": region.region_id,
-                "decision": "reject",
-                "reason": reason
-            })
+            graph.decisions.record(
+                agent="structure_gate",
+                page=page_num,
+                region_id=region.region_id,
+                decision="reject",
+                reason=reason
+            )
         
         return approved
     
@@ -159,10 +184,7 @@ class StructureGate:
         score += 0.2
         
         # Bonus: Has strong data types (dates, currency, volumes)
-        data_type_count = sum(1 for t in tokens if t.token_type in [
-            TokenType.DATE, TokenType.CURRENCY, TokenType.DATA_VOLUME,
-            TokenType.DURATION, TokenType.TIME, TokenType.NUMBER
-        ])
+        data_type_count = sum(1 for t in tokens if t.token_type in _DATA_TOKEN_TYPES)
         data_ratio = data_type_count / max(len(tokens), 1)
         reasons['data_ratio'] = round(data_ratio, 2)
         
@@ -180,32 +202,16 @@ class StructureGate:
         # Calculate adaptive tolerance
         token_heights = [t.bbox.h for t in tokens if t.bbox.h > 0]
         if token_heights:
-            median_height = sorted(token_heights)[len(token_heights) // 2]
+            median_height = _upper_median(token_heights)
             y_tolerance = median_height * 0.5
         else:
             y_tolerance = 0.01
         
         sorted_tokens = sorted(tokens, key=lambda t: (t.bbox.y, t.bbox.x))
+        lines = cluster_sorted(sorted_tokens, lambda t: t.bbox.y + t.bbox.h / 2, y_tolerance)
         
-        lines = []
-        current_line = [sorted_tokens[0]]
-        current_y = sorted_tokens[0].bbox.y
-        
-        for token in sorted_tokens[1:]:
-            token_y = token.bbox.y + (token.bbox.h / 2)
-            current_center_y = current_y + (current_line[0].bbox.h / 2)
-            
-            if abs(token_y - current_center_y) <= y_tolerance:
-                current_line.append(token)
-            else:
-                current_line.sort(key=lambda t: t.bbox.x)
-                lines.append(current_line)
-                current_line = [token]
-                current_y = token.bbox.y
-        
-        if current_line:
-            current_line.sort(key=lambda t: t.bbox.x)
-            lines.append(current_line)
+        for line in lines:
+            line.sort(key=lambda t: t.bbox.x)
         
         return lines
     
@@ -223,31 +229,17 @@ class StructureGate:
         # Calculate adaptive x-tolerance based on median token width
         token_widths = [t.bbox.w for t in tokens if t.bbox.w > 0]
         if token_widths:
-            median_width = sorted(token_widths)[len(token_widths) // 2]
+            median_width = _upper_median(token_widths)
             x_tolerance = median_width * 0.5
         else:
             x_tolerance = 0.02
         
         # Sort by x position
         sorted_tokens = sorted(tokens, key=lambda t: t.bbox.x)
+        clusters = cluster_sorted(sorted_tokens, lambda t: t.bbox.x, x_tolerance)
         
-        clusters = []
-        current_cluster = [sorted_tokens[0]]
-        current_x = sorted_tokens[0].bbox.x
-        
-        for token in sorted_tokens[1:]:
-            if abs(token.bbox.x - current_x) <= x_tolerance:
-                current_cluster.append(token)
-            else:
-                if len(current_cluster) >= 2:  # Only count significant clusters
-                    clusters.append(current_cluster)
-                current_cluster = [token]
-                current_x = token.bbox.x
-        
-        if len(current_cluster) >= 2:
-            clusters.append(current_cluster)
-        
-        return clusters
+        # Only count significant clusters
+        return [cluster for cluster in clusters if len(cluster) >= 2]
     
     @staticmethod
     def _check_type_repetition(tokens: List[Token]) -> int:
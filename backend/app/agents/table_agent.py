@@ -17,19 +17,31 @@ from app.models.document_graph import (
     DocumentGraph, Token, Region, Extraction,
     BBox, ValidationStatus, ExtractionMethod
 )
+from app.utils.clustering import cluster_sorted
 
 logger = logging.getLogger(__name__)
 
+# Cells merge_adjacent_cells joins to their neighbour: a lone currency
+# symbol before a number, a unit after one
+_CURRENCY_SYMBOLS = frozenset(('$', '£', '€', '¥'))
+_SIZE_UNITS = frozenset(('MB', 'GB', 'KB', 'TB'))
+
 
 class TableAgent:
     """
     Extracts tables using token geometry (column clustering + row grouping).
     """
     
+    # Bump when extraction output changes, to invalidate cached results
+    EXTRACTOR_VERSION = 1
+    
     # Clustering tolerances
     X_TOLERANCE = 0.02  # Column alignment tolerance (normalized coords)
     Y_TOLERANCE = 0.015  # Row alignment tolerance
     
+    # Keywords of summary rows the validator rejects inside table data
+    TOTAL_KEYWORDS = ('total', 'sum', 'subtotal', 'grand total')
+    
     @staticmethod
     def extract_table(graph: DocumentGraph, region: Region) -> Optional[Extraction]:
         """
@@ -53,9 +65,10 @@ class TableAgent:
         
         logger.info(f"Found {len(tokens)} tokens in {region.region_id}")
         
-        # Sample tokens for debugging
-        sample_tokens = [f"{t.text}@({t.bbox.x:.3f},{t.bbox.y:.3f})" for t in tokens[:5]]
-        logger.info(f"Sample tokens: {sample_tokens}")
+        # Sample tokens for debugging (not built unless info logging is on)
+        if logger.isEnabledFor(logging.INFO):
+            sample_tokens = [f"{t.text}@({t.bbox.x:.3f},{t.bbox.y:.3f})" for t in tokens[:5]]
+            logger.info(f"Sample tokens: {sample_tokens}")
         
         # Step 1: Cluster tokens into columns (vertical alignment)
         columns = TableAgent._cluster_columns(tokens)
@@ -69,8 +82,12 @@ class TableAgent:
                 # Fallback: treat as single column, group into rows
                 rows = TableAgent._group_rows(tokens, [[t] for t in tokens])
                 if len(rows) >= 2:
-                    table_data = [[t.text for t in row] for row in rows]
-                    logger.info(f"Extracted {len(rows)} rows as single-column table")
+                    table_data = TableAgent._apply_retry_context(
+                        region, [[t.text for t in row] for row in rows]
+                    )
+                    if table_data is None:
+                        return None
+                    logger.info(f"Extracted {len(table_data)} rows as single-column table")
                     
                     extraction = Extraction(
                         extraction_id=f"ext_{region.region_id}",
@@ -102,6 +119,11 @@ class TableAgent:
         # Step 3: Build table grid
         table_data = TableAgent._build_table_grid(rows, len(columns))
         
+        # Step 3b: On a retry, act on why the previous attempt was rejected
+        table_data = TableAgent._apply_retry_context(region, table_data)
+        if table_data is None:
+            return None
+        
         # Step 4: Create extraction
         extraction = Extraction(
             extraction_id=f"ext_{region.region_id}",
@@ -123,6 +145,49 @@ class TableAgent:
         
         return extraction
     
+    @staticmethod
+    def extract_batch(graph: DocumentGraph, regions: List[Region]) -> List[Optional[Extraction]]:
+        """
+        Extract tables from several regions in one call.
+        
+        Returns:
+            One entry per region, in order (None where extract_table found no table)
+        """
+        return [TableAgent.extract_table(graph, region) for region in regions]
+    
+    @staticmethod
+    def table_fingerprint(rows: List[List]) -> Tuple[Tuple[str, ...], ...]:
+        """Hashable identity of a table's cell contents"""
+        return tuple(tuple(str(cell) for cell in row) for row in rows)
+    
+    @staticmethod
+    def _apply_retry_context(region: Region, table_data: List[List[str]]) -> Optional[List[List[str]]]:
+        """
+        Adjust a retry's table using the errors that rejected earlier attempts.
+        
+        The orchestrator puts the validator's errors and the rejected parses in
+        region.hints. Summary rows flagged as "total keyword" errors are dropped,
+        and a parse identical to one already rejected is discarded (None) rather
+        than sent back through validation to fail the same way.
+        """
+        prior_errors = region.hints.get("prior_errors", [])
+        # Rebuilt as a set of tuples, which also matches hints read back from JSON
+        rejected = {TableAgent.table_fingerprint(rows) for rows in region.hints.get("rejected_fingerprints", ())}
+        if not prior_errors and not rejected:
+            return table_data
+        
+        if any("total keyword" in err for err in prior_errors):
+            kept = [row for row in table_data
+                    if not any(kw in ' '.join(row).lower() for kw in TableAgent.TOTAL_KEYWORDS)]
+            logger.info(f"Dropped {len(table_data) - len(kept)} total rows flagged by prior validation")
+            table_data = kept
+        
+        if not table_data or TableAgent.table_fingerprint(table_data) in rejected:
+            logger.warning(f"Retry of {region.hints.get('retry_of')} reproduced a rejected table, discarding")
+            return None
+        
+        return table_data
+    
     @staticmethod
     def _cluster_columns(tokens: List[Token]) -> List[List[Token]]:
         """
@@ -134,26 +199,10 @@ class TableAgent:
         if not tokens:
             return []
         
-        # Sort tokens by x position
+        # Sort tokens by x position, then split where a token falls outside
+        # the current column's tolerance
         sorted_tokens = sorted(tokens, key=lambda t: t.bbox.x)
-        
-        columns = []
-        current_column = [sorted_tokens[0]]
-        current_x = sorted_tokens[0].bbox.x
-        
-        for token in sorted_tokens[1:]:
-            # Check if token is aligned with current column
-            if abs(token.bbox.x - current_x) <= TableAgent.X_TOLERANCE:
-                current_column.append(token)
-            else:
-                # Start new column
-                columns.append(current_column)
-                current_column = [token]
-                current_x = token.bbox.x
-        
-        # Add last column
-        if current_column:
-            columns.append(current_column)
+        columns = cluster_sorted(sorted_tokens, lambda t: t.bbox.x, TableAgent.X_TOLERANCE)
         
         logger.info(f"Clustered {len(tokens)} tokens into {len(columns)} columns")
         
@@ -167,26 +216,10 @@ class TableAgent:
         Returns:
             List of rows, each containing tokens at similar y positions
         """
-        # Sort all tokens by y position
+        # Sort all tokens by y position, then split where a token falls
+        # outside the current row's tolerance
         sorted_tokens = sorted(tokens, key=lambda t: t.bbox.y)
-        
-        rows = []
-        current_row = [sorted_tokens[0]]
-        current_y = sorted_tokens[0].bbox.y
-        
-        for token in sorted_tokens[1:]:
-            # Check if token is aligned with current row
-            if abs(token.bbox.y - current_y) <= TableAgent.Y_TOLERANCE:
-                current_row.append(token)
-            else:
-                # Start new row
-                rows.append(current_row)
-                current_row = [token]
-                current_y = token.bbox.y
-        
-        # Add last row
-        if current_row:
-            rows.append(current_row)
+        rows = cluster_sorted(sorted_tokens, lambda t: t.bbox.y, TableAgent.Y_TOLERANCE)
         
         logger.info(f"Grouped {len(tokens)} tokens into {len(rows)} rows")
         
@@ -252,11 +285,11 @@ class TableAgent:
                     should_merge = False
                     
                     # 1. Currency symbol + number
-                    if cell in ['$', '£', '€', '¥'] and next_cell and next_cell[0].isdigit():
+                    if cell in _CURRENCY_SYMBOLS and next_cell and next_cell[0].isdigit():
                         should_merge = True
                     
                     # 2. Number + unit
-                    if cell and cell[-1].isdigit() and next_cell in ['MB', 'GB', 'KB', 'TB']:
+                    if cell and cell[-1].isdigit() and next_cell in _SIZE_UNITS:
                         should_merge = True
                     
                     if should_merge:
@@ -16,21 +16,29 @@ LLM-Enhanced Features:
 - Context-aware checks: "Are dates reasonable for a telecom invoice?"
 - Pattern recognition: "This looks like a currency but failed parsing"
 """
+import asyncio
 import re
 import logging
 from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal, InvalidOperation
 
 from app.models.document_graph import (
     DocumentGraph, Extraction, AgentDecision,
     ValidationStatus, TokenType
 )
-from app.services.llm import LLM, LLMRole
+from app.services.llm import LLM, LLMRole, get_llm_service
+from app.utils.keyword_matcher import KeywordMatcher
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Currency symbols, thousands separators and whitespace stripped before
+# parsing a cell as a number. A compiled sub beats str.translate here,
+# since matching \s means a table of all 29 Unicode whitespace characters
+_NUMBER_FORMATTING = re.compile(r'[$£€¥,\s]')
+
 
 class ValidatorAgent:
     """
@@ -44,20 +52,37 @@ class ValidatorAgent:
     MIN_TABLE_ROWS = 1
     MAX_TABLE_ROWS = 10000
     
+    # Semantic validation requests in flight at once in check_semantics_many
+    MAX_CONCURRENCY = 50
+    
+    # Keywords marking a "Total" row that leaked into the table data
+    TOTAL_ROW_KEYWORDS = ['total', 'sum', 'subtotal', 'grand total']
+    
+    # Keyword list compiled once into a single-scan matcher
+    _TOTAL_ROW_MATCHER = KeywordMatcher(TOTAL_ROW_KEYWORDS)
+    
     def __init__(self, llm_service: Optional[LLM] = None):
         """
         Args:
             llm_service: Optional LLM service for semantic validation
         """
-        self.llm_service = llm_service or LLM() if settings.enable_llm_agents else None
+        self.llm_service = (llm_service or get_llm_service()) if settings.enable_llm_agents else None
         self.use_llm = settings.enable_llm_agents and self.llm_service is not None
     
-    def validate_extraction(self, graph: DocumentGraph, extraction: Extraction) -> AgentDecision:
+    def validate_extraction(self, graph: DocumentGraph, extraction: Extraction,
+                            check_semantics: bool = True) -> AgentDecision:
         """
         Main validation entry point.
         
         Combines rule-based checks with optional LLM semantic validation.
         
+        Args:
+            graph: Document graph the extraction belongs to
+            extraction: Extraction to validate
+            check_semantics: Run the LLM check here. Callers validating many
+                extractions can pass False and check the accepted ones
+                together with check_semantics_many / apply_semantic_result.
+        
         Returns:
             AgentDecision indicating accept/retry/escalate
         """
@@ -68,7 +93,7 @@ class ValidatorAgent:
         confidence = 1.0
         
         # Get region for context
-        region = next((r for r in graph.regions if r.region_id == extraction.region_id), None)
+        region = graph.get_region(extraction.region_id)
         if not region:
             errors.append(f"Region {extraction.region_id} not found")
             return AgentDecision(
@@ -87,7 +112,7 @@ class ValidatorAgent:
             errors, warnings, confidence = self._validate_totals(extraction)
         
         # Phase 2: LLM semantic validation (if enabled and no hard errors)
-        if self.use_llm and not errors:
+        if check_semantics and self.use_llm and not errors:
             llm_result = self._llm_semantic_validation(extraction, graph)
             if not llm_result["is_valid"]:
                 # LLM found semantic issues
@@ -144,16 +169,7 @@ class ValidatorAgent:
             return {"is_valid": True, "confidence": 1.0, "issues": [], "suggestions": []}
         
         try:
-            # Get region to determine region_type
-            region = next((r for r in graph.regions if r.region_id == extraction.region_id), None)
-            region_type = region.region_type.value if region else "unknown"
-            
-            result = self.llm_service.validate_extraction(
-                extraction_data=extraction.data,
-                region_type=region_type,
-                document_type=graph.metadata.get("document_type", "unknown"),
-                schema=extraction.schema
-            )
+            result = self.llm_service.validate_extraction(**self._semantic_request(extraction, graph))
             
             logger.info(f"LLM validation for {extraction.extraction_id}: "
                        f"valid={result['is_valid']}, conf={result['confidence']:.2f}, "
@@ -165,6 +181,82 @@ class ValidatorAgent:
             logger.error(f"LLM semantic validation failed: {e}", exc_info=True)
             return {"is_valid": True, "confidence": 1.0, "issues": [], "suggestions": []}
     
+    def check_semantics_many(self, graph: DocumentGraph, extractions: List[Extraction],
+                             max_concurrency: int = MAX_CONCURRENCY) -> List[Dict]:
+        """
+        _llm_semantic_validation for many extractions, with the LLM calls
+        overlapped.
+        
+        Each call is mostly waiting on the network, so running them
+        concurrently (at most max_concurrency at a time) takes roughly one
+        round trip instead of one per extraction.
+        
+        Returns:
+            Semantic validation result per extraction, in the same order
+        """
+        if not self.llm_service or not extractions:
+            return [{"is_valid": True, "confidence": 1.0, "issues": [], "suggestions": []}
+                    for _ in extractions]
+        
+        async def check_one(extraction: Extraction, semaphore: asyncio.Semaphore) -> Dict:
+            try:
+                async with semaphore:
+                    return await self.llm_service.validate_extraction_async(
+                        **self._semantic_request(extraction, graph)
+                    )
+            except Exception as e:
+                logger.error(f"LLM semantic validation failed for {extraction.extraction_id}: {e}")
+                return {"is_valid": True, "confidence": 1.0, "issues": [], "suggestions": []}
+        
+        async def check_all() -> List[Dict]:
+            semaphore = asyncio.Semaphore(max_concurrency)
+            return await asyncio.gather(*(check_one(e, semaphore) for e in extractions))
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(check_all())
+        
+        # Called from code already running in an event loop (the API runs
+        # the orchestrator inside its request handler), where asyncio.run
+        # can't nest: give the batch its own loop on a worker thread
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, check_all()).result()
+    
+    @staticmethod
+    def apply_semantic_result(extraction: Extraction, decision: AgentDecision, result: Dict) -> None:
+        """
+        Fold a deferred semantic check into an accepted extraction and its decision.
+        
+        Same effect as the check running inside validate_extraction: issues
+        become warnings, which downgrade PASS to WARNING, and the LLM's
+        confidence caps the decision's.
+        """
+        if result["is_valid"]:
+            return
+        
+        issues = result.get("issues", [])
+        logger.info(f"LLM validation raised concerns: {issues}")
+        extraction.validation_errors.extend(issues)
+        decision.confidence = min(decision.confidence, result.get("confidence", 0.8))
+        
+        if extraction.validation_errors:
+            extraction.validation_status = ValidationStatus.WARNING
+            extraction.confidence = min(extraction.confidence, 0.9)
+    
+    @staticmethod
+    def _semantic_request(extraction: Extraction, graph: DocumentGraph) -> Dict:
+        """Keyword arguments for LLM.validate_extraction(_async)"""
+        region = graph.get_region(extraction.region_id)
+        return {
+            "extraction_data": extraction.data,
+            "region_type": region.region_type.value if region else "unknown",
+            "context": {
+                "document_type": graph.metadata.get("document_type", "unknown"),
+                "schema": extraction.schema
+            },
+        }
+    
     def _validate_table(self, extraction: Extraction, graph: DocumentGraph) -> Tuple[List[str], List[str], float]:
         """
         Validate table extraction.
@@ -191,16 +283,19 @@ class ValidatorAgent:
             errors.append(f"Too few rows: {len(rows)}")
             confidence *= 0.5
         
+        if not rows:
+            # Nothing for the row and column checks to look at
+            logger.info(f"Table validation: {len(errors)} errors, {len(warnings)} warnings, conf={confidence:.2f}")
+            return errors, warnings, confidence
+        
         if len(rows) > ValidatorAgent.MAX_TABLE_ROWS:
             warnings.append(f"Unusually many rows: {len(rows)}")
             confidence *= 0.9
         
         # Check 2: No "Total" rows in data
-        total_keywords = ['total', 'sum', 'subtotal', 'grand total']
-        
         for idx, row in enumerate(rows):
             row_text = ' '.join(str(cell) for cell in row).lower()
-            if any(keyword in row_text for keyword in total_keywords):
+            if ValidatorAgent._TOTAL_ROW_MATCHER.search(row_text):
                 errors.append(f"Row {idx} contains total keyword: '{row_text[:50]}'")
                 confidence *= 0.8
         
@@ -217,14 +312,15 @@ class ValidatorAgent:
             for col_idx in range(len(rows[0])):
                 column_values = [row[col_idx] for row in rows[1:] if col_idx < len(row)]
                 
-                # Check if column should be numeric
-                numeric_count = sum(1 for v in column_values 
-                                   if ValidatorAgent._is_numeric(str(v)))
+                # Check if column should be numeric (each cell parsed once,
+                # the flags are reused for the warnings below)
+                numeric_flags = [ValidatorAgent._is_numeric(str(v)) for v in column_values]
+                numeric_count = sum(numeric_flags)
                 
                 if numeric_count > len(column_values) * 0.8:
                     # Column should be mostly numeric
-                    for val in column_values:
-                        if not ValidatorAgent._is_numeric(str(val)):
+                    for val, is_numeric in zip(column_values, numeric_flags):
+                        if not is_numeric:
                             warnings.append(f"Non-numeric value in numeric column: '{val}'")
                             confidence *= 0.98
         
@@ -296,7 +392,7 @@ class ValidatorAgent:
     def _is_numeric(text: str) -> bool:
         """Check if text is numeric (handles currency, commas, etc.)"""
         # Remove common formatting
-        cleaned = re.sub(r'[$£€¥,\s]', '', text)
+        cleaned = _NUMBER_FORMATTING.sub('', text)
         
         try:
             float(cleaned)
@@ -338,7 +434,7 @@ class ValidatorAgent:
                 numeric_values = []
                 
                 for v in values:
-                    cleaned = re.sub(r'[$£€¥,\s]', '', str(v))
+                    cleaned = _NUMBER_FORMATTING.sub('', str(v))
                     try:
                         numeric_values.append(Decimal(cleaned))
                     except (InvalidOperation, ValueError):
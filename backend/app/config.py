@@ -57,6 +57,14 @@ class Settings(BaseSettings):
     # LLM Configuration (Google Gemini)
     gemini_api_key: str = ""  # Optional - enables agentic features
     enable_llm_agents: bool = True  # Use LLM for ambiguous decisions
+    llm_concurrency: int = 50  # Max LLM requests in flight when a job batches them (provider rate limits)
+    enable_schema_detection: bool = False  # Rename passed tables' columns with the Schema Agent (one LLM call per table)
+    
+    # Pipeline
+    page_workers: int = 1  # Processes per job for page layout and processing (1 = serial, the default until parallel runs are benchmarked; 0 = one per CPU)
+    pages_per_chunk: int = 32  # Max contiguous pages handed to a page worker at once
+    pdf_backend: str = "auto"  # Ingest parser: auto (pdfium if installed), pdfium, pypdf
+    extraction_cache_dir: str = ""  # Reuse extractions across runs of the same PDF ("" = disabled)
     
     # CORS - can be JSON array string or comma-separated string
     cors_origins: Union[list[str], str] = "http://localhost:3000,http://localhost:3001"
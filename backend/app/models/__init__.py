@@ -12,6 +12,8 @@ from .api import (
 from .document_graph import (
     DocumentGraph,
     Token,
+    TokenArray,
+    DecisionLog,
     Region as GraphRegion,
     Extraction,
     BBox,
@@ -32,6 +34,8 @@ __all__ = [
     # Document graph models
     'DocumentGraph',
     'Token',
+    'TokenArray',
+    'DecisionLog',
     'GraphRegion',
     'Extraction',
     'BBox',
@@ -4,12 +4,21 @@ Document Graph: Shared intermediate representation for agentic extraction.
 All agents read/write to this deterministic structure, keeping the system
 grounded and inspectable. No "magic extraction" - agents decide and validate
 based on tokens + geometry.
+
+The per-item records (BBox, Token, Region, Extraction, AgentDecision) are
+slotted dataclasses: no per-instance __dict__, so only declared fields can
+be assigned. Put ad-hoc data in Region.hints or Extraction.data instead.
 """
-from typing import List, Dict, Any, Optional, Tuple
+import math
+import sys
+from array import array
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from enum import Enum
 from dataclasses import dataclass, field
 from datetime import datetime
 
+import numpy as np
+
 
 class TokenType(str, Enum):
     """Classification of text tokens"""
@@ -62,7 +71,7 @@ class JobOutcome(str, Enum):
     FAILED = "failed"  # Processing error
 
 
-@dataclass
+@dataclass(slots=True)
 class BBox:
     """Bounding box in normalized coordinates (0-1)"""
     x: float  # left
@@ -97,7 +106,7 @@ class BBox:
         return self.width * self.height
 
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     """
     A single text token with geometry and type.
@@ -116,7 +125,92 @@ class Token:
         return f"Token('{self.text}', {self.token_type}, p{self.page})"
 
 
+# Stable int8 codes for TokenType, used by array-based token storage
+TOKEN_TYPES: List[TokenType] = list(TokenType)
+TOKEN_TYPE_CODES: Dict[TokenType, int] = {t: code for code, t in enumerate(TOKEN_TYPES)}
+
+# Compact bbox storage: normalized coordinates quantized to uint16, a
+# resolution of 1/65535 of the page (8 bytes per bbox instead of 4 floats).
+# Lossy: values outside [0, 1] (words past the page edge) are clipped to it
+BBOX_Q_SCALE = 65535
+BBOX_Q_DTYPE = np.dtype([('x', np.uint16), ('y', np.uint16), ('w', np.uint16), ('h', np.uint16)])
+
+
+def quantize_coords(values: np.ndarray) -> np.ndarray:
+    """Quantize normalized (0..1) coordinates to uint16, clipping anything off the page"""
+    return (np.clip(values, 0.0, 1.0) * BBOX_Q_SCALE).astype(np.uint16)
+
+
+def dequantize_coords(values: np.ndarray) -> np.ndarray:
+    """Convert uint16 coordinates back to normalized floats"""
+    return values.astype(np.float64) / BBOX_Q_SCALE
+
+
 @dataclass
+class TokenArray:
+    """
+    Struct-of-arrays view of a page's tokens for geometry-heavy passes.
+    
+    Coordinates live in contiguous NumPy arrays (one per field) instead of one
+    Token + BBox object pair per word, so clustering and bbox aggregation run
+    as array operations. Index i refers to the same token in every field.
+    """
+    xs: np.ndarray
+    ys: np.ndarray
+    ws: np.ndarray
+    hs: np.ndarray
+    texts: List[str]
+    types: np.ndarray  # int8 codes, see TOKEN_TYPE_CODES
+    page: int
+    
+    @classmethod
+    def from_tokens(cls, tokens: List[Token], page: int) -> 'TokenArray':
+        """Build the array view from Token objects"""
+        n = len(tokens)
+        bboxes = [t.bbox for t in tokens]
+        return cls(
+            xs=np.fromiter((b.x for b in bboxes), dtype=np.float64, count=n),
+            ys=np.fromiter((b.y for b in bboxes), dtype=np.float64, count=n),
+            ws=np.fromiter((b.w for b in bboxes), dtype=np.float64, count=n),
+            hs=np.fromiter((b.h for b in bboxes), dtype=np.float64, count=n),
+            texts=[t.text for t in tokens],
+            types=np.fromiter((TOKEN_TYPE_CODES[t.token_type] for t in tokens), dtype=np.int8, count=n),
+            page=page
+        )
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def quantized(self) -> np.ndarray:
+        """
+        Geometry as a BBOX_Q_DTYPE structured array (integer sort keys, compact storage).
+        
+        Lossy: coordinates are clipped to [0, 1] and rounded down to 1/65535,
+        so off-page tokens collapse onto the edge and close ones tie. Not an
+        ordering key on its own; see LayoutAgent._reading_order.
+        """
+        q = np.empty(len(self), dtype=BBOX_Q_DTYPE)
+        q['x'] = quantize_coords(self.xs)
+        q['y'] = quantize_coords(self.ys)
+        q['w'] = quantize_coords(self.ws)
+        q['h'] = quantize_coords(self.hs)
+        return q
+    
+    def __getitem__(self, i: int) -> Token:
+        """Materialize a single Token (for API boundaries)"""
+        return Token(
+            text=self.texts[i],
+            bbox=BBox(float(self.xs[i]), float(self.ys[i]), float(self.ws[i]), float(self.hs[i])),
+            page=self.page,
+            token_type=TOKEN_TYPES[self.types[i]]
+        )
+    
+    def to_tokens(self) -> List[Token]:
+        """Materialize every token, in array order"""
+        return [self[i] for i in range(len(self))]
+
+
+@dataclass(slots=True)
 class Region:
     """
     A candidate region (table, key-value block, etc.)
@@ -141,7 +235,7 @@ class Region:
         return f"Region({self.region_id}, {self.region_type}, {len(self.token_ids)} tokens)"
 
 
-@dataclass
+@dataclass(slots=True)
 class Extraction:
     """
     Typed extraction output from a region.
@@ -163,6 +257,8 @@ class Extraction:
     extracted_by: str = "unknown"  # which agent/extractor?
     method: ExtractionMethod = ExtractionMethod.AGENT_INFERRED
     timestamp: datetime = field(default_factory=datetime.now)
+    attempt: int = 0  # 0 = first extraction, n = n-th retry
+    parent_extraction_id: Optional[str] = None  # extraction this retry replaces
     
     def __repr__(self) -> str:
         return f"Extraction({self.extraction_id}, {self.schema}, {self.validation_status})"
@@ -179,7 +275,7 @@ class DebugArtifact:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentDecision:
     """
     Structured decision from an agent.
@@ -204,6 +300,110 @@ class AgentDecision:
         return f"Decision({self.action}, conf={self.confidence:.2f})"
 
 
+@dataclass
+class DecisionLog:
+    """
+    Columnar audit trail of agent decisions.
+    
+    One entry per decision, stored as parallel columns rather than one dict
+    per entry: agent and decision names are interned, page and confidence
+    live in typed arrays, and the optional text fields are None where unset.
+    Entries are materialized as dicts only when read (iteration, to_dicts).
+    """
+    agents: List[str] = field(default_factory=list)
+    decisions: List[str] = field(default_factory=list)
+    pages: array = field(default_factory=lambda: array('i'))  # -1 = no page
+    confidences: array = field(default_factory=lambda: array('d'))  # NaN = unset
+    region_ids: List[Optional[str]] = field(default_factory=list)
+    extraction_ids: List[Optional[str]] = field(default_factory=list)
+    reasons: List[Optional[str]] = field(default_factory=list)
+    explanations: List[Optional[str]] = field(default_factory=list)
+    errors: List[Optional[str]] = field(default_factory=list)
+    timestamps: List[Optional[str]] = field(default_factory=list)  # ISO 8601
+    
+    def record(
+        self,
+        agent: str,
+        decision: str,
+        page: Optional[int] = None,
+        region_id: Optional[str] = None,
+        extraction_id: Optional[str] = None,
+        confidence: Optional[float] = None,
+        reason: Optional[str] = None,
+        explanation: Optional[str] = None,
+        error: Optional[str] = None,
+        timestamp: Optional[str] = None
+    ) -> None:
+        """Append one decision"""
+        self.agents.append(sys.intern(agent))
+        self.decisions.append(sys.intern(decision))
+        self.pages.append(-1 if page is None else page)
+        self.confidences.append(math.nan if confidence is None else confidence)
+        self.region_ids.append(region_id)
+        self.extraction_ids.append(extraction_id)
+        self.reasons.append(reason)
+        self.explanations.append(explanation)
+        self.errors.append(error)
+        self.timestamps.append(timestamp)
+    
+    def extend(self, other: 'DecisionLog') -> None:
+        """Append every decision from another log, in order"""
+        self.agents.extend(other.agents)
+        self.decisions.extend(other.decisions)
+        self.pages.extend(other.pages)
+        self.confidences.extend(other.confidences)
+        self.region_ids.extend(other.region_ids)
+        self.extraction_ids.extend(other.extraction_ids)
+        self.reasons.extend(other.reasons)
+        self.explanations.extend(other.explanations)
+        self.errors.extend(other.errors)
+        self.timestamps.extend(other.timestamps)
+    
+    def since(self, start: int) -> 'DecisionLog':
+        """Decisions from index start onwards, as a new log"""
+        return DecisionLog(
+            agents=self.agents[start:],
+            decisions=self.decisions[start:],
+            pages=self.pages[start:],
+            confidences=self.confidences[start:],
+            region_ids=self.region_ids[start:],
+            extraction_ids=self.extraction_ids[start:],
+            reasons=self.reasons[start:],
+            explanations=self.explanations[start:],
+            errors=self.errors[start:],
+            timestamps=self.timestamps[start:]
+        )
+    
+    def __len__(self) -> int:
+        return len(self.agents)
+    
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        """Materialize one decision as a dict (unset fields omitted)"""
+        entry: Dict[str, Any] = {"agent": self.agents[i], "decision": self.decisions[i]}
+        if self.pages[i] >= 0:
+            entry["page"] = self.pages[i]
+        if not math.isnan(self.confidences[i]):
+            entry["confidence"] = self.confidences[i]
+        for key, column in (
+            ("region_id", self.region_ids),
+            ("extraction_id", self.extraction_ids),
+            ("reason", self.reasons),
+            ("explanation", self.explanations),
+            ("error", self.errors),
+            ("timestamp", self.timestamps),
+        ):
+            if column[i] is not None:
+                entry[key] = column[i]
+        return entry
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self[i] for i in range(len(self)))
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Every decision as a JSON-serializable dict"""
+        return list(self)
+
+
 @dataclass
 class DocumentGraph:
     """
@@ -221,17 +421,26 @@ class DocumentGraph:
     debug_artifacts: List[DebugArtifact] = field(default_factory=list)
     
     # Agent decisions and audit trail
-    decisions: List[Dict[str, Any]] = field(default_factory=list)
+    decisions: DecisionLog = field(default_factory=DecisionLog)
     
     # Job state
     status: str = "pending"
     outcome: Optional[JobOutcome] = None
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
+    metadata: Dict[str, Any] = field(default_factory=dict)  # job-level facts, e.g. document_type
     
     # Trace/Summary for observability
     trace: List[Dict[str, Any]] = field(default_factory=list)
     
+    # Region lookup indexes, maintained by add_region
+    _regions_by_page: Dict[int, List[Region]] = field(default_factory=dict, init=False, repr=False)
+    _regions_by_id: Dict[str, Region] = field(default_factory=dict, init=False, repr=False)
+    
+    def next_token_id(self) -> int:
+        """ID the next added token will receive"""
+        return len(self.tokens)
+    
     def add_token(self, token: Token) -> int:
         """Add a token and return its ID"""
         token_id = len(self.tokens)
@@ -241,19 +450,43 @@ class DocumentGraph:
     def add_region(self, region: Region) -> str:
         """Add a region and return its ID"""
         self.regions.append(region)
+        self._regions_by_page.setdefault(region.page, []).append(region)
+        self._regions_by_id.setdefault(region.region_id, region)
         return region.region_id
     
+    def get_region(self, region_id: str) -> Optional[Region]:
+        """Look up a region by ID (first added wins on duplicate IDs)"""
+        return self._regions_by_id.get(region_id)
+    
+    def get_regions_for_page(self, page_num: int) -> List[Region]:
+        """Regions on a page, in the order they were added"""
+        return list(self._regions_by_page.get(page_num, ()))
+    
     def add_extraction(self, extraction: Extraction) -> str:
         """Add an extraction and return its ID"""
         self.extractions.append(extraction)
         return extraction.extraction_id
     
+    def extractions_by_status(self) -> Dict[ValidationStatus, List[Extraction]]:
+        """
+        Extractions grouped by validation status, in one pass.
+        
+        Built on demand rather than kept up to date in add_extraction, since
+        validation and retries change an extraction's status after it's added.
+        """
+        groups: Dict[ValidationStatus, List[Extraction]] = {}
+        for extraction in self.extractions:
+            groups.setdefault(extraction.validation_status, []).append(extraction)
+        return groups
+    
     def get_tokens_in_region(self, region_id: str) -> List[Token]:
         """Get all tokens contained in a region"""
-        region = next((r for r in self.regions if r.region_id == region_id), None)
+        region = self.get_region(region_id)
         if not region:
             return []
-        return [self.tokens[tid] for tid in region.token_ids if tid < len(self.tokens)]
+        tokens = self.tokens
+        num_tokens = len(tokens)
+        return [tokens[tid] for tid in region.token_ids if tid < num_tokens]
     
     def to_dict(self) -> Dict[str, Any]:
         """Serialize for Firestore storage"""
@@ -5,6 +5,7 @@ from app.services.storage import storage_service
 from app.services.documentai import documentai_service
 from app.services.formatter import formatter_service
 from app.config import get_settings
+import os
 import uuid
 import logging
 
@@ -160,14 +161,18 @@ async def process_agentic_extraction(job_id: str, request: ExtractionRequest):
             tmp.write(pdf_bytes)
             pdf_path = tmp.name
         
-        orchestrator = ExpertOrchestrator(pdf_path, job_id)
-        graph = orchestrator.run()
+        try:
+            orchestrator = ExpertOrchestrator(pdf_path, job_id)
+            graph = orchestrator.run()
+        finally:
+            # Nothing reads the PDF after run()
+            os.remove(pdf_path)
         
         results = []
         for idx, extraction in enumerate(graph.extractions):
             if extraction.validation_status.name == "PASS":
                 # Get region for page info
-                region = next((r for r in graph.regions if r.region_id == extraction.region_id), None)
+                region = graph.get_region(extraction.region_id)
                 page = region.page if region else 0
                 
                 # Convert to ExtractionResult for formatter compatibility
@@ -0,0 +1,102 @@
+"""
+Extraction Cache: reuse specialist results across runs of the same PDF.
+
+Extraction is deterministic for a given PDF, region and extractor version,
+so re-running a job (or re-running after a downstream change) can skip the
+specialists entirely. Entries are small JSON files in a local directory,
+keyed by a hash of (PDF content, region ID, region bbox, extractor version).
+Bump the extractor's version constant to invalidate old entries.
+
+Enabled by setting EXTRACTION_CACHE_DIR; empty (the default) disables it.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+from app.models.document_graph import Extraction, ExtractionMethod, Region
+
+logger = logging.getLogger(__name__)
+
+# Read size for streaming the PDF into the fingerprint hash
+FINGERPRINT_CHUNK_SIZE = 1024 * 1024
+
+
+def pdf_fingerprint(pdf_path: str) -> str:
+    """Content hash of a PDF (streamed, so large files aren't read into memory)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(pdf_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(FINGERPRINT_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """On-disk cache of Extraction results"""
+    
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def make_key(fingerprint: str, region: Region, extractor_version: int) -> str:
+        """Cache key for one region of one PDF"""
+        bbox = (region.bbox.x, region.bbox.y, region.bbox.w, region.bbox.h)
+        raw = f"{fingerprint}:{region.region_id}:{bbox}:{extractor_version}"
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def get(self, key: str, region_id: str) -> Optional[Extraction]:
+        """
+        Cached extraction for a key, or None on a miss.
+        
+        The result is a fresh PENDING Extraction; validation always reruns.
+        """
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry {key}: {e}")
+            return None
+        
+        return Extraction(
+            extraction_id=entry["extraction_id"],
+            region_id=region_id,
+            data=entry["data"],
+            schema=entry["schema"],
+            confidence=entry["confidence"],
+            extracted_by=entry["extracted_by"],
+            method=ExtractionMethod(entry["method"]),
+            # Absent from entries written before they were cached
+            attempt=entry.get("attempt", 0),
+            parent_extraction_id=entry.get("parent_extraction_id")
+        )
+    
+    def put(self, key: str, extraction: Extraction) -> None:
+        """Store an extraction (atomically, so readers never see a partial file)"""
+        entry: Dict[str, Any] = {
+            "extraction_id": extraction.extraction_id,
+            "data": extraction.data,
+            "schema": extraction.schema,
+            "confidence": extraction.confidence,
+            "extracted_by": extraction.extracted_by,
+            "method": extraction.method.value,
+            "attempt": extraction.attempt,
+            "parent_extraction_id": extraction.parent_extraction_id
+        }
+        
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to cache extraction {extraction.extraction_id}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
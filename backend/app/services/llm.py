@@ -3,16 +3,25 @@ LLM Service: Wrapper for Google Gemini API (Vertex AI).
 
 Provides structured prompts and response parsing for agentic decision-making.
 """
+import copy
+import hashlib
 import logging
 import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from enum import Enum
-import google.generativeai as genai
 from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Validation answers kept in memory, one cache for the whole process and every
+# job in it (least recently used dropped); at well under 1 KB per answer this
+# caps it at a few MB however many jobs run
+VALIDATION_CACHE_SIZE = 10_000
+
 
 class LLMRole(Enum):
     """Specific roles for LLM agents"""
@@ -28,8 +37,19 @@ class LLM:
     Uses Google Gemini via Vertex AI for consistency with GCP stack.
     """
     
+    # Validation answers by prompt hash, so repeat templates skip the round
+    # trip. Jobs share the LLM from get_llm_service() and validate
+    # concurrently, hence the lock; kept on the class so an LLM built
+    # directly shares it too
+    _validation_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    _validation_cache_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize Gemini client"""
+        # Imported here rather than at module load: the Gemini SDK (grpc,
+        # protobuf) is slow to import and only needed when LLM agents are on
+        import google.generativeai as genai
+        
         try:
             genai.configure(api_key=settings.gemini_api_key)
             self.model = genai.GenerativeModel('gemini-1.5-flash')
@@ -132,11 +152,40 @@ Respond ONLY with valid JSON:
         if not self.is_available() or not table_data or len(table_data) < 2:
             return self._fallback_schema(table_data)
         
+        try:
+            response = self.model.generate_content(self._schema_prompt(table_data))
+            return self._parse_schema_response(response.text)
+        except Exception as e:
+            logger.error(f"LLM schema detection failed: {e}")
+            return self._fallback_schema(table_data)
+    
+    async def detect_table_schema_async(
+        self,
+        table_data: List[List[str]],
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        detect_table_schema without blocking the event loop, so many tables
+        can be in flight at once (see SchemaAgent.detect_schema_many)
+        """
+        if not self.is_available() or not table_data or len(table_data) < 2:
+            return self._fallback_schema(table_data)
+        
+        try:
+            response = await self.model.generate_content_async(self._schema_prompt(table_data))
+            return self._parse_schema_response(response.text)
+        except Exception as e:
+            logger.error(f"LLM schema detection failed: {e}")
+            return self._fallback_schema(table_data)
+    
+    @staticmethod
+    def _schema_prompt(table_data: List[List[str]]) -> str:
+        """Schema detection prompt for a table"""
         # Sample first 10 rows for analysis
         sample_rows = table_data[:10]
         sample_text = "\n".join([" | ".join(row) for row in sample_rows])
         
-        prompt = f"""You are a data schema expert. Analyze this table and identify column meanings.
+        return f"""You are a data schema expert. Analyze this table and identify column meanings.
 
 TABLE SAMPLE (first {len(sample_rows)} rows):
 {sample_text}
@@ -156,19 +205,17 @@ Respond ONLY with valid JSON:
   "confidence": 0.0-1.0,
   "likely_domain": "domain_type"
 }}"""
+    
+    @staticmethod
+    def _parse_schema_response(text: str) -> Dict[str, Any]:
+        """Parse the schema detection response (raises on malformed JSON)"""
+        result = json.loads(text.strip())
         
-        try:
-            response = self.model.generate_content(prompt)
-            result = json.loads(response.text.strip())
-            
-            logger.info(f"LLM schema detection: {len(result['columns'])} columns, "
-                       f"domain: {result['likely_domain']}, "
-                       f"confidence: {result['confidence']}")
-            
-            return result
-        except Exception as e:
-            logger.error(f"LLM schema detection failed: {e}")
-            return self._fallback_schema(table_data)
+        logger.info(f"LLM schema detection: {len(result['columns'])} columns, "
+                   f"domain: {result['likely_domain']}, "
+                   f"confidence: {result['confidence']}")
+        
+        return result
     
     def validate_extraction(
         self,
@@ -193,11 +240,94 @@ Respond ONLY with valid JSON:
             }
         """
         if not self.is_available():
-            return {"is_valid": True, "confidence": 0.5, "issues": [], "suggestions": []}
+            return self._fallback_validation()
+        
+        prompt = self._validation_prompt(extraction_data, region_type, context)
+        cache_key = self._validation_cache_key(prompt)
+        cached = self._cached_validation(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = self.model.generate_content(prompt)
+            result = self._parse_validation_response(response.text)
+        except Exception as e:
+            logger.error(f"LLM validation failed: {e}")
+            return self._fallback_validation()
         
+        self._cache_validation(cache_key, result)
+        return result
+    
+    async def validate_extraction_async(
+        self,
+        extraction_data: Dict[str, Any],
+        region_type: str,
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        validate_extraction without blocking the event loop, so many
+        extractions can be checked at once (see ValidatorAgent.check_semantics_many)
+        """
+        if not self.is_available():
+            return self._fallback_validation()
+        
+        prompt = self._validation_prompt(extraction_data, region_type, context)
+        cache_key = self._validation_cache_key(prompt)
+        cached = self._cached_validation(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await self.model.generate_content_async(prompt)
+            result = self._parse_validation_response(response.text)
+        except Exception as e:
+            logger.error(f"LLM validation failed: {e}")
+            return self._fallback_validation()
+        
+        self._cache_validation(cache_key, result)
+        return result
+    
+    @staticmethod
+    def _validation_cache_key(prompt: str) -> str:
+        """
+        Cache key for a validation prompt.
+        
+        The prompt is exactly what the model sees (region type, context and
+        the data preview), so equal prompts get the same answer.
+        """
+        return hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest()
+    
+    @classmethod
+    def _cached_validation(cls, key: str) -> Optional[Dict[str, Any]]:
+        """Cached validation answer for a key (as a copy), or None on a miss"""
+        with cls._validation_cache_lock:
+            result = cls._validation_cache.get(key)
+            if result is None:
+                return None
+            cls._validation_cache.move_to_end(key)
+        
+        logger.info("LLM validation cache hit")
+        return copy.deepcopy(result)
+    
+    @classmethod
+    def _cache_validation(cls, key: str, result: Dict[str, Any]) -> None:
+        """Remember a validation answer, evicting the least recently used past the limit"""
+        with cls._validation_cache_lock:
+            cls._validation_cache[key] = copy.deepcopy(result)
+            cls._validation_cache.move_to_end(key)
+            while len(cls._validation_cache) > VALIDATION_CACHE_SIZE:
+                cls._validation_cache.popitem(last=False)
+    
+    @staticmethod
+    def _validation_prompt(
+        extraction_data: Dict[str, Any],
+        region_type: str,
+        context: Dict[str, Any]
+    ) -> str:
+        """Semantic validation prompt for an extraction"""
         data_preview = json.dumps(extraction_data, indent=2)[:1500]
         
-        prompt = f"""You are a data quality validator. Check if this extracted data makes sense.
+        return f"""You are a data quality validator. Check if this extracted data makes sense.
 
 REGION TYPE: {region_type}
 EXTRACTED DATA:
@@ -220,19 +350,17 @@ Respond ONLY with valid JSON:
   "issues": ["list of specific problems found"],
   "suggestions": ["possible ways to fix issues"]
 }}"""
+    
+    @staticmethod
+    def _parse_validation_response(text: str) -> Dict[str, Any]:
+        """Parse the validation response (raises on malformed JSON)"""
+        result = json.loads(text.strip())
         
-        try:
-            response = self.model.generate_content(prompt)
-            result = json.loads(response.text.strip())
-            
-            logger.info(f"LLM validation: valid={result['is_valid']}, "
-                       f"confidence={result['confidence']}, "
-                       f"issues={len(result.get('issues', []))}")
-            
-            return result
-        except Exception as e:
-            logger.error(f"LLM validation failed: {e}")
-            return {"is_valid": True, "confidence": 0.5, "issues": [], "suggestions": []}
+        logger.info(f"LLM validation: valid={result['is_valid']}, "
+                   f"confidence={result['confidence']}, "
+                   f"issues={len(result.get('issues', []))}")
+        
+        return result
     
     def diagnose_extraction_failure(
         self,
@@ -323,6 +451,10 @@ Respond ONLY with valid JSON:
             "likely_domain": "unknown"
         }
     
+    def _fallback_validation(self) -> Dict[str, Any]:
+        """Fallback for semantic validation: accept with middling confidence"""
+        return {"is_valid": True, "confidence": 0.5, "issues": [], "suggestions": []}
+    
     def _fallback_diagnosis(self) -> Dict[str, Any]:
         """Rule-based fallback for error diagnosis"""
         return {
@@ -333,5 +465,12 @@ Respond ONLY with valid JSON:
         }
 
 
-# Global instance
-llm_service = LLM()
+@lru_cache()
+def get_llm_service() -> LLM:
+    """
+    Shared LLM client, created on first use.
+    
+    Agents fall back to this when they aren't handed one, so a process
+    configures Gemini once, and not at all while LLM agents are disabled.
+    """
+    return LLM()
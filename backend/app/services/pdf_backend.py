@@ -0,0 +1,334 @@
+"""
+PDF Backend: page count, page size and text for PDF ingest.
+
+Prefers pypdfium2 (PDFium bindings; text extraction runs in native code)
+and falls back to pypdf. The PDF_BACKEND setting picks one explicitly:
+"auto" (default), "pdfium" or "pypdf".
+
+Usage:
+    doc = open_pdf(path)
+    try:
+        for page_num in range(doc.num_pages):
+            width, height = doc.page_size(page_num)
+            text = doc.page_text(page_num) if doc.has_text_layer(page_num) else ""
+            needs_ocr = doc.text_length(page_num, enough=20) < 20
+    finally:
+        doc.close()
+"""
+import ctypes
+import io
+import logging
+import os
+import re
+from typing import Optional, Tuple
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+try:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    pdfium = None
+    pdfium_c = None
+    PDFIUM_AVAILABLE = False
+
+# PDFs up to this size are read into memory whole so pypdf's many small
+# seeks and reads never touch the file; larger ones get a big read buffer
+MAX_INMEM_BYTES = 200 * 1024 * 1024
+READ_BUFFER_SIZE = 256 * 1024
+
+
+# String operands of the text-showing operators: (..) Tj, (..) ' and
+# (..) ", and [(..) -250 (..)] TJ
+_LITERAL = rb"\((?:\\.|[^\\)])*\)"
+_HEX = rb"<[0-9A-Fa-f\s]*>"
+_SHOW_TEXT = re.compile(
+    rb"(" + _LITERAL + rb"|" + _HEX + rb")\s*(?:Tj|'|\")"
+    rb"|\[((?:" + _LITERAL + rb"|" + _HEX + rb"|[^\]\(<])*)\]\s*TJ"
+)
+_STRING = re.compile(_LITERAL + rb"|" + _HEX)
+
+
+def _string_length(operand: bytes) -> int:
+    """Approximate non-whitespace character count of one PDF string operand"""
+    if operand[:1] == b"<":
+        # Assume two-byte codes; undercounting just means falling back sooner
+        return sum(1 for c in operand if c not in b"<> \t\r\n") // 4
+    # Padding spaces ("(       2) Tj") aren't counted: PDFium drops them
+    return len(operand[1:-1].translate(None, b" \t\r\n")) - operand.count(b"\\")
+
+
+def _visible_length(text: str) -> int:
+    """Character count of text, ignoring whitespace"""
+    return len("".join(text.split()))
+
+
+# Straight-line path operators: "x y l" draws one segment, "x y w h re" a
+# rectangle (four). Operators are whitespace-delimited tokens; the odd "l"
+# inside a text string overcounts, which only errs towards keeping a page
+_LINE_OPS = re.compile(rb"(?<=\s)(l|re)(?=\s)")
+
+
+def _count_ruling_lines(data: bytes) -> int:
+    """Straight line segments drawn by a content stream"""
+    count = 0
+    for match in _LINE_OPS.finditer(data):
+        count += 4 if match.group(1) == b"re" else 1
+    return count
+
+
+def _read_file(path: str) -> bytes:
+    """
+    Read a whole file in one call.
+    
+    Tells the kernel up front that the whole file is wanted, so on a cold
+    cache it queues readahead for all of it rather than growing the window
+    read by read. Unbuffered, since FileIO.readall sizes its one buffer
+    from the file and BytesIO can then share it without a copy.
+    """
+    with open(path, 'rb', buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+            except OSError:
+                pass
+        return f.read()
+
+
+# Form XObjects nested deeper than this are assumed to contain text
+MAX_FORM_DEPTH = 4
+
+
+def _resources_have_fonts(resources, depth: int = 0) -> bool:
+    """Whether a pypdf resource dictionary, or any form XObject in it, declares fonts"""
+    if resources is None:
+        return False
+    resources = resources.get_object()
+    if resources.get("/Font"):
+        return True
+    if depth >= MAX_FORM_DEPTH:
+        return True
+    
+    xobjects = resources.get("/XObject")
+    if xobjects is None:
+        return False
+    for xobject in xobjects.get_object().values():
+        xobject = xobject.get_object()
+        if xobject.get("/Subtype") == "/Form" and _resources_have_fonts(xobject.get("/Resources"), depth + 1):
+            return True
+    return False
+
+
+class PypdfDocument:
+    """pypdf-backed document (pure Python)"""
+    
+    name = "pypdf"
+    
+    def __init__(self, pdf_path: str):
+        from pypdf import PdfReader
+        
+        if os.path.getsize(pdf_path) <= MAX_INMEM_BYTES:
+            self._stream = io.BytesIO(_read_file(pdf_path))
+        else:
+            self._stream = io.BufferedReader(io.FileIO(pdf_path, 'rb'), buffer_size=READ_BUFFER_SIZE)
+        
+        try:
+            self._reader = PdfReader(self._stream)
+            # Walk the page tree once; reader.pages[i] goes through pypdf's
+            # lazy page list on every access
+            self._pages = list(self._reader.pages)
+        except Exception:
+            self._stream.close()
+            raise
+    
+    @property
+    def num_pages(self) -> int:
+        return len(self._pages)
+    
+    def page_size(self, page_num: int) -> Tuple[float, float]:
+        """Mediabox (width, height) in points"""
+        # Index the rectangle's array directly; .width/.height go through
+        # .left/.right etc., each wrapping its value in a new FloatObject
+        mediabox = self._pages[page_num].mediabox
+        return float(mediabox[2]) - float(mediabox[0]), float(mediabox[3]) - float(mediabox[1])
+    
+    def has_text_layer(self, page_num: int) -> bool:
+        """
+        Whether the page can contain text at all: it (or a form XObject it
+        draws) has font resources. Cheap compared to extract_text, and a
+        page without fonts always extracts as empty.
+        """
+        try:
+            return _resources_have_fonts(self._pages[page_num].get("/Resources"))
+        except Exception as e:
+            logger.debug(f"Font resource check failed on page {page_num}: {e}")
+            return True
+    
+    def page_text(self, page_num: int) -> str:
+        return self._pages[page_num].extract_text() or ""
+    
+    def text_length(self, page_num: int, enough: int) -> int:
+        """
+        Rough text length of a page (whitespace not counted), for deciding
+        whether it needs OCR.
+        
+        Sums the string operands of the page's text-showing operators,
+        stopping once `enough` is reached, which skips extract_text's glyph
+        mapping and layout. Below `enough` the scan can't be trusted (text
+        in form XObjects, multi-byte encodings), so falls back to the length
+        of the extracted text.
+        """
+        try:
+            contents = self._pages[page_num].get_contents()
+            raw = contents.get_data() if contents is not None else b""
+        except Exception as e:
+            logger.debug(f"Content stream read failed on page {page_num}: {e}")
+            raw = b""
+        
+        length = 0
+        for match in _SHOW_TEXT.finditer(raw):
+            if match.group(1) is not None:
+                length += _string_length(match.group(1))
+            else:
+                for operand in _STRING.findall(match.group(2)):
+                    length += _string_length(operand)
+            if length >= enough:
+                return length
+        
+        return _visible_length(self.page_text(page_num))
+    
+    def ruling_line_count(self, page_num: int) -> int:
+        """Straight line segments the page draws, including inside form XObjects"""
+        page = self._pages[page_num]
+        contents = page.get_contents()
+        count = _count_ruling_lines(contents.get_data()) if contents is not None else 0
+        return count + self._form_ruling_lines(page.get("/Resources"), 0)
+    
+    def _form_ruling_lines(self, resources, depth: int) -> int:
+        if resources is None or depth >= MAX_FORM_DEPTH:
+            return 0
+        xobjects = resources.get_object().get("/XObject")
+        if xobjects is None:
+            return 0
+        
+        count = 0
+        for xobject in xobjects.get_object().values():
+            xobject = xobject.get_object()
+            if xobject.get("/Subtype") == "/Form":
+                count += _count_ruling_lines(xobject.get_data())
+                count += self._form_ruling_lines(xobject.get("/Resources"), depth + 1)
+        return count
+    
+    def close(self) -> None:
+        self._reader.close()
+        self._stream.close()
+
+
+class PdfiumDocument:
+    """PDFium-backed document via pypdfium2"""
+    
+    name = "pdfium"
+    
+    def __init__(self, pdf_path: str):
+        self._pdf = pdfium.PdfDocument(pdf_path)
+        # Ingest asks for size, text layer and text of one page after
+        # another, so keep the current page loaded instead of reloading it
+        self._page = None
+        self._page_num = -1
+    
+    @property
+    def num_pages(self) -> int:
+        return len(self._pdf)
+    
+    def _get_page(self, page_num: int):
+        if page_num != self._page_num:
+            self._close_page()
+            self._page = self._pdf[page_num]
+            self._page_num = page_num
+        return self._page
+    
+    def _close_page(self) -> None:
+        if self._page is not None:
+            self._page.close()
+            self._page = None
+            self._page_num = -1
+    
+    def page_size(self, page_num: int) -> Tuple[float, float]:
+        """Mediabox (width, height) in points, unrotated, as with pypdf"""
+        page = self._get_page(page_num)
+        # get_mediabox() only reads the page's own dictionary; a box inherited
+        # from the page tree is only resolved by get_bbox(), which is the
+        # MediaBox clipped to the CropBox (get_size() also applies /Rotate)
+        left, bottom, right, top = page.get_mediabox(fallback_ok=False) or page.get_bbox()
+        return float(right - left), float(top - bottom)
+    
+    def has_text_layer(self, page_num: int) -> bool:
+        """Whether the page has any text objects (including inside forms)"""
+        page = self._get_page(page_num)
+        return any(True for _ in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_TEXT]))
+    
+    def page_text(self, page_num: int) -> str:
+        textpage = self._get_page(page_num).get_textpage()
+        try:
+            return textpage.get_text_range()
+        finally:
+            textpage.close()
+    
+    def text_length(self, page_num: int, enough: int) -> int:
+        """Character count of the page's text layer, whitespace not counted"""
+        return _visible_length(self.page_text(page_num))
+    
+    def ruling_line_count(self, page_num: int) -> int:
+        """
+        Straight line segments the page draws (path objects, including inside forms).
+        
+        PDFium stores a rectangle ("re") as a move and three lines, the fourth
+        side being implied by the close flag on the last point. A closing line
+        segment that ends away from its subpath's start therefore counts as
+        one more line, so a rectangle is four, as in _count_ruling_lines.
+        """
+        count = 0
+        x, y = ctypes.c_float(), ctypes.c_float()
+        for path in self._get_page(page_num).get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_PATH]):
+            start = None
+            for i in range(pdfium_c.FPDFPath_CountSegments(path.raw)):
+                segment = pdfium_c.FPDFPath_GetPathSegment(path.raw, i)
+                segment_type = pdfium_c.FPDFPathSegment_GetType(segment)
+                pdfium_c.FPDFPathSegment_GetPoint(segment, ctypes.byref(x), ctypes.byref(y))
+                if segment_type == pdfium_c.FPDF_SEGMENT_MOVETO:
+                    start = (x.value, y.value)
+                elif segment_type == pdfium_c.FPDF_SEGMENT_LINETO:
+                    count += 1
+                    if pdfium_c.FPDFPathSegment_GetClose(segment) and (x.value, y.value) != start:
+                        count += 1
+        return count
+    
+    def close(self) -> None:
+        self._close_page()
+        self._pdf.close()
+
+
+def open_pdf(pdf_path: str, backend: Optional[str] = None):
+    """
+    Open a PDF with the configured backend.
+    
+    Args:
+        pdf_path: Local path to the PDF
+        backend: "auto", "pdfium" or "pypdf" (defaults to settings.pdf_backend)
+    
+    Returns:
+        PdfiumDocument or PypdfDocument
+    """
+    backend = backend or settings.pdf_backend
+    
+    if backend == "pdfium" and not PDFIUM_AVAILABLE:
+        logger.warning("PDF_BACKEND=pdfium but pypdfium2 is not installed, using pypdf")
+    
+    if backend in ("auto", "pdfium") and PDFIUM_AVAILABLE:
+        return PdfiumDocument(pdf_path)
+    
+    return PypdfDocument(pdf_path)
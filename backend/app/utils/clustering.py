@@ -0,0 +1,48 @@
+"""
+One-dimensional token clustering shared by the agents' geometry heuristics.
+
+StructureGate groups tokens into lines and columns to score regions, and
+TableAgent groups them into rows and columns to build the grid. Both walk
+the tokens in order and start a new group once a token strays too far from
+the group's first token; this module holds that walk.
+"""
+from typing import Callable, List, TypeVar
+
+T = TypeVar("T")
+
+
+def cluster_sorted(items: List[T], key: Callable[[T], float], tolerance: float) -> List[List[T]]:
+    """
+    Split already-ordered items into runs anchored on each run's first item.
+    
+    An item joins the current run while abs(key(item) - key(anchor)) is
+    within `tolerance`; otherwise it starts a new run and becomes its
+    anchor. Items are walked and grouped in input order, so callers sort
+    them along the axis first.
+    
+    Args:
+        items: Items in the order to walk them
+        key: Position of an item along the clustering axis
+        tolerance: Largest allowed distance from the run's anchor
+    
+    Returns:
+        List of runs, each a non-empty list of items
+    """
+    if not items:
+        return []
+    
+    groups = []
+    current = [items[0]]
+    anchor = key(items[0])
+    
+    for item in items[1:]:
+        value = key(item)
+        if abs(value - anchor) <= tolerance:
+            current.append(item)
+        else:
+            groups.append(current)
+            current = [item]
+            anchor = value
+    
+    groups.append(current)
+    return groups
@@ -0,0 +1,53 @@
+"""
+Multi-keyword substring matching for agent heuristics.
+
+Uses a pyahocorasick automaton when the package is installed, so a text is
+scanned once no matter how many keywords there are. Otherwise falls back to
+checking each keyword with the `in` operator.
+"""
+import logging
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+
+class KeywordMatcher:
+    """
+    Finds whether any of a fixed set of keywords occurs in a text.
+    
+    Keywords are matched as plain substrings, case-sensitively; callers
+    lowercase both sides if they need case-insensitive matching.
+    """
+    
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(keywords)
+        self._automaton = None
+        
+        if AHOCORASICK_AVAILABLE and self.keywords:
+            automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self._automaton = automaton
+    
+    def find(self, text: str) -> Optional[str]:
+        """Return the first keyword found in text, or None"""
+        if self._automaton is not None:
+            for _, keyword in self._automaton.iter(text):
+                return keyword
+            return None
+        
+        # str.__contains__ is a C-level search; for the short keyword lists used
+        # by the agents, bigram prefilters or a regex alternation measured no faster
+        return next((keyword for keyword in self.keywords if keyword in text), None)
+    
+    def search(self, text: str) -> bool:
+        """Check if any keyword occurs in text"""
+        return self.find(text) is not None
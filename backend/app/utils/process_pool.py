@@ -0,0 +1,24 @@
+"""
+Start method for the page worker pools (layout and page processing).
+
+Jobs run inside the API server, which by then has live threads (its worker
+threads, the storage and Document AI grpc clients); forking it would copy
+their locks and connections mid-use. Workers are instead forked from a fork
+server: a fresh process, started on first use, that imports the pipeline
+modules once so workers don't pay for them. Where there is no forkserver
+(Windows), workers are spawned. Either way they get their inputs pickled.
+"""
+import multiprocessing
+from multiprocessing.context import BaseContext
+
+# Imported once in the fork server, so every worker starts with them loaded
+_PRELOAD_MODULES = ["app.agents.orchestrator", "app.agents.layout_agent"]
+
+
+def worker_context() -> BaseContext:
+    """Multiprocessing context for a worker pool (forkserver, else spawn)"""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(_PRELOAD_MODULES)
+        return context
+    return multiprocessing.get_context("spawn")
@@ -8,6 +8,13 @@ from unittest.mock import MagicMock
 
 os.environ["TESTING"] = "true"
 
+# Settings the app modules need at import; the agent tests never reach GCP,
+# and LLM agents stay off unless a test enables them with a stub client
+os.environ.setdefault("GCP_PROJECT_ID", "test-project")
+os.environ.setdefault("GCP_PROCESSOR_ID", "test-processor")
+os.environ.setdefault("GCS_BUCKET_NAME", "test-bucket")
+os.environ.setdefault("ENABLE_LLM_AGENTS", "false")
+
 
 @pytest.fixture
 def sample_document_data():
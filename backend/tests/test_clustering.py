@@ -0,0 +1,81 @@
+"""
+Token clustering tests.
+
+cluster_sorted groups tokens into lines, rows and columns for StructureGate
+and TableAgent; these pin where its groups start and end.
+"""
+
+import pytest
+
+from app.models.document_graph import BBox, Token
+from app.utils.clustering import cluster_sorted
+
+
+def _identity(value):
+    return value
+
+
+class TestClusterSorted:
+    """Test anchor-based 1-D clustering."""
+    
+    def test_empty(self):
+        """Test no items give no groups."""
+        assert cluster_sorted([], _identity, 1.0) == []
+    
+    def test_single_item(self):
+        """Test one item is one group."""
+        assert cluster_sorted([5.0], _identity, 1.0) == [[5.0]]
+    
+    def test_distance_equal_to_tolerance_joins(self):
+        """Test an item exactly `tolerance` from the anchor stays in the group."""
+        assert cluster_sorted([0.5, 0.75], _identity, 0.25) == [[0.5, 0.75]]
+    
+    def test_distance_just_over_tolerance_splits(self):
+        """Test an item just past `tolerance` from the anchor starts a new group."""
+        assert cluster_sorted([0.5, 0.75 + 1e-9], _identity, 0.25) == [[0.5], [0.75 + 1e-9]]
+    
+    def test_zero_tolerance(self):
+        """Test zero tolerance groups only equal positions."""
+        assert cluster_sorted([1.0, 1.0, 2.0, 2.0, 2.5], _identity, 0.0) == [[1.0, 1.0], [2.0, 2.0], [2.5]]
+    
+    def test_distance_measured_from_anchor_not_previous_item(self):
+        """Test a chain of close items doesn't drift past the anchor's tolerance."""
+        groups = cluster_sorted([0.0, 2.0, 3.0, 4.0, 5.0, 6.5], _identity, 3.0)
+        
+        assert groups == [[0.0, 2.0, 3.0], [4.0, 5.0, 6.5]]
+    
+    def test_new_anchor_is_first_item_of_group(self):
+        """Test the item that opens a group is the new anchor."""
+        groups = cluster_sorted([0.0, 10.0, 12.0, 13.0, 14.0], _identity, 3.0)
+        
+        assert groups == [[0.0], [10.0, 12.0, 13.0], [14.0]]
+    
+    def test_descending_order(self):
+        """Test distance is absolute, so descending input clusters the same way."""
+        groups = cluster_sorted([10.0, 9.0, 8.0, 6.5], _identity, 2.0)
+        
+        assert groups == [[10.0, 9.0, 8.0], [6.5]]
+    
+    @pytest.mark.parametrize("tolerance", [0.0, 0.004, 0.01, 0.05, 1.0])
+    def test_groups_partition_input_in_order(self, tolerance):
+        """Test every item lands in exactly one group, in input order."""
+        values = sorted([0.1, 0.102, 0.11, 0.2, 0.205, 0.5, 0.5, 0.51, 0.9])
+        
+        groups = cluster_sorted(values, _identity, tolerance)
+        
+        assert [v for group in groups for v in group] == values
+        assert all(group for group in groups)
+        for group in groups:
+            assert all(abs(v - group[0]) <= tolerance for v in group)
+    
+    def test_key_on_tokens(self):
+        """Test grouping tokens into lines by their y position."""
+        tokens = [
+            Token(text=text, bbox=BBox(x=x, y=y, w=0.05, h=0.01), page=0)
+            for text, x, y in [("Date", 0.1, 0.100), ("Amount", 0.5, 0.102),
+                               ("01/07", 0.1, 0.120), ("12.50", 0.5, 0.121)]
+        ]
+        
+        lines = cluster_sorted(tokens, lambda t: t.bbox.y, 0.005)
+        
+        assert [[t.text for t in line] for line in lines] == [["Date", "Amount"], ["01/07", "12.50"]]
@@ -0,0 +1,129 @@
+"""
+Document graph tests.
+
+Covers the columnar DecisionLog: every column must stay the same length so
+entry i reads the same decision from each of them.
+"""
+
+import math
+
+from app.models.document_graph import DecisionLog
+
+
+def _columns(log):
+    return [log.agents, log.decisions, log.pages, log.confidences, log.region_ids,
+            log.extraction_ids, log.reasons, log.explanations, log.errors, log.timestamps]
+
+
+def _assert_aligned(log):
+    assert {len(column) for column in _columns(log)} == {len(log)}
+
+
+def _sample_log():
+    """Log mixing full entries with ones that leave optional fields unset"""
+    log = DecisionLog()
+    log.record(agent="orchestrator", decision="use_pdf_text", page=0, reason="PDF has native text",
+               timestamp="2025-07-01T10:00:00.000000")
+    log.record(agent="structure_gate", decision="reject", page=0, region_id="p0_r1", confidence=0.2,
+               reason="too few columns", explanation="2 tokens per line")
+    log.record(agent="validator", decision="accept", page=1, region_id="p1_r0",
+               extraction_id="ext_p1_r0", confidence=0.9)
+    log.record(agent="orchestrator", decision="failed", error="boom")
+    return log
+
+
+class TestDecisionLog:
+    """Test the columnar decision audit trail."""
+    
+    def test_record_fills_every_column(self):
+        """Test record appends one value to each column, unset fields included."""
+        log = _sample_log()
+        
+        _assert_aligned(log)
+        assert len(log) == 4
+    
+    def test_entries_omit_unset_fields(self):
+        """Test materialized entries only hold the fields that were set."""
+        log = _sample_log()
+        
+        assert log[1] == {
+            "agent": "structure_gate", "decision": "reject", "page": 0, "confidence": 0.2,
+            "region_id": "p0_r1", "reason": "too few columns", "explanation": "2 tokens per line"
+        }
+        assert log[3] == {"agent": "orchestrator", "decision": "failed", "error": "boom"}
+    
+    def test_page_zero_and_confidence_zero_kept(self):
+        """Test page 0 and confidence 0.0 aren't mistaken for unset."""
+        log = DecisionLog()
+        log.record(agent="gate", decision="reject", page=0, confidence=0.0)
+        
+        assert log[0]["page"] == 0
+        assert log[0]["confidence"] == 0.0
+    
+    def test_unset_page_and_confidence_markers(self):
+        """Test unset page and confidence are stored as -1 and NaN."""
+        log = _sample_log()
+        
+        assert log.pages[3] == -1
+        assert math.isnan(log.confidences[0])
+    
+    def test_since(self):
+        """Test since(n) returns entries n onwards with columns still aligned."""
+        log = _sample_log()
+        
+        tail = log.since(2)
+        
+        _assert_aligned(tail)
+        assert tail.to_dicts() == log.to_dicts()[2:]
+        assert log.since(0).to_dicts() == log.to_dicts()
+        assert len(log.since(len(log))) == 0
+        _assert_aligned(log.since(len(log)))
+    
+    def test_since_is_a_copy(self):
+        """Test the log since() returns doesn't share columns with the original."""
+        log = _sample_log()
+        
+        tail = log.since(1)
+        tail.record(agent="validator", decision="reject")
+        
+        assert len(log) == 4
+        _assert_aligned(log)
+    
+    def test_extend(self):
+        """Test extend appends another log in order, keeping columns aligned."""
+        log = _sample_log()
+        other = DecisionLog()
+        other.record(agent="table_agent", decision="retry", page=3, extraction_id="ext_p3_r0", confidence=0.4)
+        other.record(agent="validator", decision="accept", reason="ok")
+        
+        expected = log.to_dicts() + other.to_dicts()
+        log.extend(other)
+        
+        _assert_aligned(log)
+        assert log.to_dicts() == expected
+    
+    def test_extend_with_empty_log(self):
+        """Test extending with an empty log changes nothing."""
+        log = _sample_log()
+        before = log.to_dicts()
+        
+        log.extend(DecisionLog())
+        
+        _assert_aligned(log)
+        assert log.to_dicts() == before
+    
+    def test_page_slices_merge_back(self):
+        """Test per-page since() slices extended into another log rebuild it, as page workers' results do."""
+        worker = DecisionLog()
+        parent = DecisionLog()
+        for page in range(3):
+            start = len(worker)
+            worker.record(agent="structure_gate", decision="approve", page=page,
+                          region_id=f"p{page}_r0", confidence=0.8)
+            worker.record(agent="structure_gate", decision="reject", page=page, reason="sparse")
+            parent.extend(worker.since(start))
+        
+        _assert_aligned(parent)
+        assert parent.to_dicts() == worker.to_dicts()
+        assert parent.pages.typecode == "i"
+        assert parent.confidences.typecode == "d"
@@ -0,0 +1,194 @@
+"""
+Extraction cache tests.
+
+Exercises the on-disk cache in a temporary directory, and the orchestrator's
+use of it on a fixture PDF.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from app.agents import orchestrator as orchestrator_module
+from app.agents.orchestrator import ExpertOrchestrator
+from app.models.document_graph import (
+    BBox, Extraction, ExtractionMethod, Region, RegionType, ValidationStatus
+)
+from app.services.extraction_cache import ExtractionCache, pdf_fingerprint
+
+
+FIXTURE_PDF = Path(__file__).resolve().parents[2] / "test-pdfs" / "my-bill 25 08.pdf"
+
+
+def _region(region_id="p0_table_0", bbox=(0.1, 0.2, 0.5, 0.3)):
+    return Region(region_id=region_id, region_type=RegionType.TABLE, bbox=BBox(*bbox), page=0)
+
+
+def _extraction(**overrides):
+    fields = dict(
+        extraction_id="ext_p0_table_0",
+        region_id="p0_table_0",
+        data={"rows": [["Date", "Amount"], ["01/07", "12.50"]], "columns": ["Date", "Amount"]},
+        schema="invoice",
+        confidence=0.87,
+        validation_status=ValidationStatus.PASS,
+        validation_errors=["stale error"],
+        extracted_by="table_agent",
+        method=ExtractionMethod.PDF_NATIVE,
+        attempt=2,
+        parent_extraction_id="ext_p0_table_0_retry1"
+    )
+    fields.update(overrides)
+    return Extraction(**fields)
+
+
+class TestCacheKey:
+    """Test cache key derivation."""
+    
+    def test_fingerprint_is_blake2b_of_content(self, tmp_path):
+        """Test the fingerprint is the blake2b digest of the file bytes."""
+        pdf = tmp_path / "doc.pdf"
+        pdf.write_bytes(b"%PDF-1.4 test content")
+        
+        assert pdf_fingerprint(str(pdf)) == hashlib.blake2b(b"%PDF-1.4 test content", digest_size=16).hexdigest()
+    
+    def test_fingerprint_streams_large_files(self, tmp_path, monkeypatch):
+        """Test chunked reading gives the same digest as hashing the whole file."""
+        content = os.urandom(10_000)
+        pdf = tmp_path / "doc.pdf"
+        pdf.write_bytes(content)
+        monkeypatch.setattr("app.services.extraction_cache.FINGERPRINT_CHUNK_SIZE", 1000)
+        
+        assert pdf_fingerprint(str(pdf)) == hashlib.blake2b(content, digest_size=16).hexdigest()
+    
+    def test_key_is_stable(self):
+        """Test the same PDF, region and version always give the same key."""
+        assert ExtractionCache.make_key("abc", _region(), 1) == ExtractionCache.make_key("abc", _region(), 1)
+    
+    @pytest.mark.parametrize("fingerprint,region,version", [
+        ("abd", _region(), 1),
+        ("abc", _region(region_id="p0_table_1"), 1),
+        ("abc", _region(bbox=(0.1, 0.2, 0.5, 0.31)), 1),
+        ("abc", _region(), 2),
+    ])
+    def test_key_changes_with_inputs(self, fingerprint, region, version):
+        """Test the PDF, region ID, bbox and extractor version all feed the key."""
+        assert ExtractionCache.make_key(fingerprint, region, version) != ExtractionCache.make_key("abc", _region(), 1)
+
+
+class TestCacheEntries:
+    """Test storing and reading extractions."""
+    
+    def test_round_trip(self, tmp_path):
+        """Test every extracted field survives put/get, and validation state is reset."""
+        cache = ExtractionCache(str(tmp_path))
+        original = _extraction()
+        cache.put("key", original)
+        
+        cached = cache.get("key", "p0_table_0")
+        
+        assert cached.extraction_id == original.extraction_id
+        assert cached.region_id == original.region_id
+        assert cached.data == original.data
+        assert cached.schema == original.schema
+        assert cached.confidence == original.confidence
+        assert cached.extracted_by == original.extracted_by
+        assert cached.method == original.method
+        assert cached.attempt == 2
+        assert cached.parent_extraction_id == "ext_p0_table_0_retry1"
+        assert cached.validation_status == ValidationStatus.PENDING
+        assert cached.validation_errors == []
+    
+    def test_entry_without_retry_fields(self, tmp_path):
+        """Test entries written before attempt/parent_extraction_id were cached still load."""
+        cache = ExtractionCache(str(tmp_path))
+        cache.put("key", _extraction())
+        path = tmp_path / "key.json"
+        entry = json.loads(path.read_text())
+        del entry["attempt"], entry["parent_extraction_id"]
+        path.write_text(json.dumps(entry))
+        
+        cached = cache.get("key", "p0_table_0")
+        
+        assert cached.attempt == 0
+        assert cached.parent_extraction_id is None
+    
+    def test_miss(self, tmp_path):
+        """Test an unknown key is a miss."""
+        assert ExtractionCache(str(tmp_path)).get("missing", "p0_table_0") is None
+    
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        """Test an unreadable entry is ignored."""
+        (tmp_path / "key.json").write_text("{not json")
+        
+        assert ExtractionCache(str(tmp_path)).get("key", "p0_table_0") is None
+    
+    def test_put_leaves_no_temp_files(self, tmp_path):
+        """Test writes go through a temp file that is renamed into place."""
+        cache = ExtractionCache(str(tmp_path))
+        cache.put("key", _extraction())
+        cache.put("key", _extraction(confidence=0.5))
+        
+        assert os.listdir(tmp_path) == ["key.json"]
+        assert cache.get("key", "p0_table_0").confidence == 0.5
+    
+    def test_failed_put_keeps_previous_entry(self, tmp_path):
+        """Test an entry that can't be serialized leaves the old one intact."""
+        cache = ExtractionCache(str(tmp_path))
+        cache.put("key", _extraction())
+        cache.put("key", _extraction(data={"rows": [[object()]]}))
+        
+        assert os.listdir(tmp_path) == ["key.json"]
+        assert cache.get("key", "p0_table_0").data == _extraction().data
+    
+    def test_miss_after_file_changes(self, tmp_path):
+        """Test a changed PDF gets a different key, so old entries aren't reused."""
+        cache = ExtractionCache(str(tmp_path / "cache"))
+        pdf = tmp_path / "doc.pdf"
+        pdf.write_bytes(b"%PDF-1.4 version one")
+        cache.put(ExtractionCache.make_key(pdf_fingerprint(str(pdf)), _region(), 1), _extraction())
+        
+        pdf.write_bytes(b"%PDF-1.4 version two")
+        
+        assert cache.get(ExtractionCache.make_key(pdf_fingerprint(str(pdf)), _region(), 1), "p0_table_0") is None
+
+
+@pytest.mark.skipif(not FIXTURE_PDF.exists(), reason="fixture PDFs not available")
+class TestOrchestratorCache:
+    """Test the orchestrator's use of the cache."""
+    
+    @staticmethod
+    def _run(monkeypatch, cache_dir):
+        monkeypatch.setattr(orchestrator_module.settings, "enable_llm_agents", False)
+        monkeypatch.setattr(orchestrator_module.settings, "page_workers", 1)
+        monkeypatch.setattr(orchestrator_module.settings, "extraction_cache_dir", cache_dir)
+        monkeypatch.setattr(ExpertOrchestrator, "_extract_tables_with_camelot", lambda self, page_nums: None)
+        orchestrator = ExpertOrchestrator(str(FIXTURE_PDF), "test-job")
+        return orchestrator, orchestrator.run()
+    
+    def test_disabled(self, monkeypatch):
+        """Test an empty EXTRACTION_CACHE_DIR disables the cache."""
+        orchestrator, graph = self._run(monkeypatch, "")
+        
+        assert orchestrator._extraction_cache is None
+        assert graph.status == "completed"
+    
+    def test_second_run_served_from_cache(self, tmp_path, monkeypatch):
+        """Test a rerun reads every table from the cache and gives the same result."""
+        cache_dir = str(tmp_path / "cache")
+        _, first = self._run(monkeypatch, cache_dir)
+        entries = sorted(os.listdir(cache_dir))
+        assert entries
+        
+        extracted = []
+        monkeypatch.setattr("app.agents.table_agent.TableAgent.extract_batch",
+                            lambda graph, regions: extracted.extend(regions) or [None] * len(regions))
+        _, second = self._run(monkeypatch, cache_dir)
+        
+        assert extracted == []
+        assert sorted(os.listdir(cache_dir)) == entries
+        assert ([(e.extraction_id, e.data, e.validation_status) for e in second.extractions] ==
+                [(e.extraction_id, e.data, e.validation_status) for e in first.extractions])
@@ -0,0 +1,84 @@
+"""
+KeywordMatcher tests.
+
+Run against both matching paths: the Aho-Corasick automaton (when
+pyahocorasick is installed) and the plain substring fallback.
+"""
+
+import pytest
+
+from app.agents.layout_agent import LayoutAgent
+from app.agents.validator_agent import ValidatorAgent
+from app.utils import keyword_matcher
+from app.utils.keyword_matcher import KeywordMatcher
+
+
+@pytest.fixture(params=["automaton", "fallback"])
+def make_matcher(request, monkeypatch):
+    """KeywordMatcher factory for one matching path"""
+    if request.param == "automaton":
+        if not keyword_matcher.AHOCORASICK_AVAILABLE:
+            pytest.skip("pyahocorasick not installed")
+    else:
+        monkeypatch.setattr(keyword_matcher, "AHOCORASICK_AVAILABLE", False)
+    return KeywordMatcher
+
+
+class TestKeywordMatcher:
+    """Test multi-keyword substring matching."""
+    
+    def test_no_keywords(self, make_matcher):
+        """Test an empty keyword list never matches."""
+        matcher = make_matcher([])
+        
+        assert matcher.find("total") is None
+        assert not matcher.search("total")
+    
+    def test_single_hit(self, make_matcher):
+        """Test a keyword anywhere in the text is found."""
+        matcher = make_matcher(["balance", "total"])
+        
+        assert matcher.find("amount due: total $12.00") == "total"
+        assert matcher.search("opening balance")
+        assert not matcher.search("amount due")
+    
+    def test_substring_hits(self, make_matcher):
+        """Test keywords match inside longer words, not just whole words."""
+        matcher = make_matcher(["sum"])
+        
+        assert matcher.search("summary of charges")
+        assert matcher.search("consumption")
+    
+    @pytest.mark.parametrize("text,expected", [
+        ("subtotal", {"subtotal", "total"}),
+        ("grand total", {"grand total", "total"}),
+        ("1 gb = 1024 mb", {"1 gb ="}),
+        ("gigabytes used", {"gigabyte"}),
+    ])
+    def test_overlapping_hits(self, make_matcher, text, expected):
+        """Test overlapping and nested keywords: a keyword that occurs is returned."""
+        matcher = make_matcher(LayoutAgent.TABLE_STOP_CUES)
+        
+        assert matcher.search(text)
+        assert matcher.find(text) in expected
+    
+    def test_case_sensitive(self, make_matcher):
+        """Test matching is case-sensitive; callers lowercase the text."""
+        matcher = make_matcher(ValidatorAgent.TOTAL_ROW_KEYWORDS)
+        
+        assert not matcher.search("GRAND TOTAL")
+        assert not matcher.search("SUBTOTAL")
+        assert matcher.find("GRAND TOTAL".lower()) in {"grand total", "total"}
+        assert matcher.search("SUBTOTAL".lower())
+    
+    @pytest.mark.parametrize("text", [
+        "", "total", "Total Calls", "account summary", "sub-total", "balance brought forward",
+        "plan details", "mobile", "1 mb = 1024 kb", "charges", "xyz",
+    ])
+    def test_matches_substring_reference(self, make_matcher, text):
+        """Test search agrees with checking each keyword with `in`."""
+        keywords = LayoutAgent.TABLE_STOP_CUES + LayoutAgent.STRONG_HEADING_KEYWORDS
+        matcher = make_matcher(keywords)
+        
+        for candidate in (text, text.lower()):
+            assert matcher.search(candidate) == any(k in candidate for k in keywords)
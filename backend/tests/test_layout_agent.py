@@ -0,0 +1,180 @@
+"""
+Layout Agent tests.
+
+Token classification and line clustering are pure computation, so these run
+without a PDF.
+"""
+
+import numpy as np
+import pytest
+
+from app.agents import layout_agent as layout_module
+from app.agents.layout_agent import LayoutAgent
+from app.models.document_graph import BBOX_Q_SCALE, TokenArray, TokenType
+
+
+# (token text, expected type)
+TIMES = [
+    ("10:30", TokenType.TIME),
+    ("23:59", TokenType.TIME),
+    ("9:05 AM", TokenType.TIME),
+    ("11:45pm", TokenType.TIME),
+    ("1:02:03 PM", TokenType.TIME),
+]
+
+# Typed TIME before durations were told apart (the DURATION pattern was
+# shadowed by TIME, so nothing was ever classified DURATION)
+DURATIONS = [
+    ("24:00", TokenType.DURATION),
+    ("30:00", TokenType.DURATION),
+    ("83:00", TokenType.DURATION),
+    ("00:01:23", TokenType.DURATION),
+]
+
+DATES = [
+    ("12/10/2025", TokenType.DATE),
+    ("1-2-25", TokenType.DATE),
+    ("06 Oct", TokenType.DATE),
+    ("15 January 2025", TokenType.DATE),
+]
+
+# PHONE comes before CURRENCY in PATTERNS and matches any run of digits,
+# so most amounts are typed PHONE; pinned so a reordering is deliberate
+AMOUNTS = [
+    ("$70.00", TokenType.PHONE),
+    ("$1,234.56", TokenType.PHONE),
+    ("70.00", TokenType.PHONE),
+    ("12.50 AUD", TokenType.DATE),
+    ("$5", TokenType.CURRENCY),
+]
+
+OTHER = [
+    ("Total", TokenType.TEXT),
+    ("9:5", TokenType.TEXT),
+    ("7", TokenType.NUMBER),
+    ("2.5 GB", TokenType.DATA_VOLUME),
+    ("billing@example.com", TokenType.EMAIL),
+]
+
+ALL_CASES = TIMES + DURATIONS + DATES + AMOUNTS + OTHER
+
+
+class TestInferTokenType:
+    """Test token classification."""
+    
+    @pytest.mark.parametrize("text,expected", ALL_CASES)
+    def test_classification(self, text, expected):
+        """Test each token gets its pinned type."""
+        assert LayoutAgent.infer_token_type(text) == expected
+    
+    @pytest.mark.parametrize("text,expected", TIMES + DURATIONS)
+    def test_surrounding_whitespace_ignored(self, text, expected):
+        """Test padding doesn't change the time/duration decision."""
+        assert LayoutAgent.infer_token_type(f"  {text} ") == expected
+    
+    def test_per_pattern_loop_matches_combined_pattern(self, monkeypatch):
+        """Test the fallback loop (used with RE2) agrees with the single-pass pattern."""
+        if LayoutAgent._COMBINED_PATTERN is None:
+            pytest.skip("combined pattern unavailable with RE2")
+        
+        combined = [LayoutAgent.infer_token_type(text) for text, _ in ALL_CASES]
+        
+        LayoutAgent.infer_token_type.cache_clear()
+        monkeypatch.setattr(LayoutAgent, "_COMBINED_PATTERN", None)
+        try:
+            looped = [LayoutAgent.infer_token_type(text) for text, _ in ALL_CASES]
+        finally:
+            LayoutAgent.infer_token_type.cache_clear()
+        
+        assert looped == combined
+
+
+def _token_rows(num_lines, per_line):
+    """TokenArray of num_lines rows of per_line evenly spaced tokens"""
+    n = num_lines * per_line
+    ys = np.repeat(np.linspace(0.0, 0.99, num_lines), per_line)
+    xs = np.tile(np.linspace(0.0, 0.99, per_line), num_lines)
+    return TokenArray(
+        xs=xs, ys=ys, ws=np.full(n, 0.001), hs=np.full(n, 0.0005),
+        texts=["x"] * n, types=np.zeros(n, dtype=np.int8), page=0
+    )
+
+
+class TestClusterLines:
+    """Test the line clustering scan and its numba size gate."""
+    
+    def test_small_pages_skip_numba(self, monkeypatch):
+        """Test pages below NUMBA_MIN_TOKENS never call the compiled kernel."""
+        def fail(centers, tolerance):
+            raise AssertionError("numba kernel called for a small page")
+        monkeypatch.setattr(layout_module, "NUMBA_AVAILABLE", True)
+        monkeypatch.setattr(layout_module, "_line_starts_native", fail, raising=False)
+        
+        lines = LayoutAgent._cluster_line_indices(_token_rows(20, 10))
+        
+        assert len(lines) == 20
+    
+    def test_native_matches_python(self, monkeypatch):
+        """Test dense pages cluster the same with the kernel as without it."""
+        if not layout_module.NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+        token_array = _token_rows(200, 60)
+        assert len(token_array) >= layout_module.NUMBA_MIN_TOKENS
+        
+        native = LayoutAgent._cluster_line_indices(token_array)
+        monkeypatch.setattr(layout_module, "NUMBA_AVAILABLE", False)
+        python = LayoutAgent._cluster_line_indices(token_array)
+        
+        assert native == python
+        assert len(native) == 200
+
+
+def _float_order(token_array):
+    """Baseline reading order: a stable sort on the float (y, x) keys"""
+    return sorted(range(len(token_array)), key=lambda i: (token_array.ys[i], token_array.xs[i]))
+
+
+def _token_array(points):
+    """TokenArray of small tokens at the given (x, y) positions"""
+    n = len(points)
+    return TokenArray(
+        xs=np.array([x for x, _ in points]), ys=np.array([y for _, y in points]),
+        ws=np.full(n, 0.01), hs=np.full(n, 0.01),
+        texts=[f"t{i}" for i in range(n)], types=np.zeros(n, dtype=np.int8), page=0
+    )
+
+
+class TestReadingOrder:
+    """Test the quantized token sort agrees with the float (y, x) sort."""
+    
+    def test_in_page_tokens(self):
+        """Test ordinary page geometry sorts the same as the float keys."""
+        token_array = _token_rows(30, 8)
+        rng = np.random.default_rng(0)
+        shuffled = rng.permutation(len(token_array))
+        token_array = TokenArray(
+            xs=token_array.xs[shuffled], ys=token_array.ys[shuffled], ws=token_array.ws[shuffled],
+            hs=token_array.hs[shuffled], texts=token_array.texts, types=token_array.types, page=0
+        )
+        
+        assert LayoutAgent._reading_order(token_array).tolist() == _float_order(token_array)
+    
+    def test_off_page_tokens(self):
+        """Test tokens past the page edges keep their float order instead of collapsing when clipped."""
+        token_array = _token_array([(0.5, -0.02), (0.2, -0.05), (0.3, 0.5), (-0.1, 0.5),
+                                    (0.4, 1.03), (0.1, 1.01)])
+        
+        order = LayoutAgent._reading_order(token_array).tolist()
+        
+        assert order == _float_order(token_array)
+        assert order == [1, 0, 3, 2, 5, 4]
+    
+    def test_sub_quantum_ties(self):
+        """Test tokens closer than one quantum are still ordered by their float coordinates."""
+        step = 0.1 / BBOX_Q_SCALE
+        token_array = _token_array([(0.2, 0.5 + step), (0.8, 0.5), (0.5 + step, 0.3), (0.5, 0.3)])
+        
+        order = LayoutAgent._reading_order(token_array).tolist()
+        
+        assert order == _float_order(token_array)
+        assert order == [3, 2, 1, 0]
@@ -0,0 +1,277 @@
+"""
+Orchestrator tests.
+
+Runs the agentic pipeline on the fixture PDFs in test-pdfs/ with a stub LLM
+client, so no GCP or Gemini access is needed.
+"""
+
+import asyncio
+import json
+import sys
+from types import SimpleNamespace
+from pathlib import Path
+
+import pytest
+
+from app.agents import orchestrator as orchestrator_module
+from app.agents.orchestrator import ExpertOrchestrator
+from app.models.document_graph import AgentDecision, BBox, Extraction, Region, RegionType, ValidationStatus
+
+
+FIXTURE_DIR = Path(__file__).resolve().parents[2] / "test-pdfs"
+FIXTURE_PDFS = sorted(FIXTURE_DIR.glob("*.pdf"))
+
+
+class StubLLM:
+    """LLM client that flags tables with an odd number of rows"""
+    
+    def __init__(self):
+        self.calls = 0
+        self.contexts = []
+    
+    def is_available(self):
+        return True
+    
+    def _answer(self, extraction_data, region_type, context):
+        self.calls += 1
+        self.contexts.append(context)
+        num_rows = len(extraction_data.get("rows", []))
+        return {
+            "is_valid": num_rows % 2 == 0,
+            "confidence": 0.6,
+            "issues": [f"odd row count {num_rows}"],
+            "suggestions": []
+        }
+    
+    def validate_extraction(self, **kwargs):
+        return self._answer(**kwargs)
+    
+    async def validate_extraction_async(self, **kwargs):
+        await asyncio.sleep(0)
+        return self._answer(**kwargs)
+    
+    async def detect_table_schema_async(self, table_data, context):
+        await asyncio.sleep(0)
+        return {
+            "columns": [{"name": f"col_{i}", "type": "TEXT", "description": ""} for i in range(len(table_data[0]))],
+            "confidence": 0.5,
+            "likely_domain": "unknown"
+        }
+    
+    def diagnose_extraction_failure(self, *args, **kwargs):
+        return {"diagnosis": "", "root_cause": "OTHER", "recommended_retry": "pad_crop", "confidence": 0.3}
+
+
+def _without_timestamps(records):
+    return [{k: v for k, v in record.items() if k != "timestamp"} for record in records]
+
+
+def _run(pdf_path, page_workers, monkeypatch):
+    """Run the pipeline on a PDF and return what it produced, comparably"""
+    monkeypatch.setattr(orchestrator_module.settings, "enable_llm_agents", True)
+    monkeypatch.setattr(orchestrator_module.settings, "page_workers", page_workers)
+    # Camelot (and Ghostscript) aren't installed in the test environment
+    monkeypatch.setattr(ExpertOrchestrator, "_extract_tables_with_camelot", lambda self, page_nums: None)
+    
+    llm = StubLLM()
+    graph = ExpertOrchestrator(str(pdf_path), "test-job", llm_service=llm).run()
+    
+    return {
+        "status": graph.status,
+        "outcome": graph.outcome,
+        "extractions": [
+            (e.extraction_id, e.region_id, e.data, e.validation_status, e.validation_errors, e.confidence, e.schema)
+            for e in graph.extractions
+        ],
+        "decisions": _without_timestamps(graph.decisions.to_dicts()),
+        "trace": _without_timestamps(graph.trace),
+        "llm_calls": llm.calls,
+    }
+
+
+@pytest.mark.skipif(not FIXTURE_PDFS, reason="fixture PDFs not available")
+class TestParallelPageProcessing:
+    """Page workers must produce exactly what a serial run does."""
+    
+    @pytest.mark.parametrize("pdf_path", FIXTURE_PDFS, ids=lambda p: p.name)
+    def test_parallel_matches_serial(self, pdf_path, monkeypatch):
+        """Test extractions, statuses, decisions and LLM checks match across modes."""
+        serial = _run(pdf_path, 1, monkeypatch)
+        parallel = _run(pdf_path, 3, monkeypatch)
+        
+        assert serial["status"] == "completed"
+        assert parallel == serial
+    
+    def test_accepted_extractions_get_semantic_check(self, monkeypatch):
+        """Test accepted extractions from page workers reach the LLM check and are logged."""
+        result = _run(FIXTURE_DIR / "my-bill 25 08.pdf", 3, monkeypatch)
+        
+        validator_decisions = [d for d in result["decisions"] if d.get("agent") == "validator"]
+        assert result["extractions"]
+        assert result["llm_calls"] == len(validator_decisions) == len(result["extractions"])
+    
+    def test_semantic_check_gets_document_type(self, monkeypatch):
+        """Test the LLM semantic check is sent the graph's document type and the schema."""
+        monkeypatch.setattr(orchestrator_module.settings, "enable_llm_agents", True)
+        monkeypatch.setattr(orchestrator_module.settings, "page_workers", 1)
+        monkeypatch.setattr(ExpertOrchestrator, "_extract_tables_with_camelot", lambda self, page_nums: None)
+        llm = StubLLM()
+        orchestrator = ExpertOrchestrator(str(FIXTURE_DIR / "my-bill 25 08.pdf"), "test-job", llm_service=llm)
+        orchestrator.graph.metadata["document_type"] = "utility_bill"
+        
+        orchestrator.run()
+        
+        assert llm.contexts
+        assert all(context == {"document_type": "utility_bill", "schema": None} for context in llm.contexts)
+    
+    def test_no_schema_by_default(self, monkeypatch):
+        """Test tables keep the extractor's columns unless schema detection is enabled."""
+        result = _run(FIXTURE_DIR / "my-bill 25 08.pdf", 1, monkeypatch)
+        
+        assert result["extractions"]
+        assert all(schema is None for *_, schema in result["extractions"])
+    
+    def test_passed_tables_get_schema(self, monkeypatch):
+        """Test the Schema Agent names the columns of tables that passed validation."""
+        monkeypatch.setattr(orchestrator_module.settings, "enable_schema_detection", True)
+        result = _run(FIXTURE_DIR / "my-bill 25 08.pdf", 1, monkeypatch)
+        
+        tables = [e for e in result["extractions"] if len(e[2].get("rows", [])) >= 2]
+        assert tables
+        for extraction_id, _, data, status, _, _, schema in tables:
+            if status == ValidationStatus.PASS:
+                assert schema["detected_by"] == "schema_agent_llm"
+                assert data["columns"] == [f"col_{i}" for i in range(len(data["rows"][0]))]
+            else:
+                assert schema is None
+    
+    def test_page_worker_orchestrator_has_no_llm(self, monkeypatch):
+        """Test the orchestrator a page worker builds leaves the LLM client to the parent."""
+        monkeypatch.setattr(orchestrator_module.settings, "enable_llm_agents", True)
+        worker = ExpertOrchestrator(str(FIXTURE_DIR / "my-bill 25 08.pdf"), "test-job", llm_service=StubLLM(),
+                                    parallel=False, in_page_worker=True)
+        
+        assert worker.llm_service is None
+        assert worker._validator is None
+
+
+class TestRetries:
+    """Retries are validated as retries and carry only serializable hints."""
+    
+    @pytest.fixture
+    def orchestrator(self, monkeypatch):
+        monkeypatch.setattr(orchestrator_module.settings, "enable_llm_agents", False)
+        return ExpertOrchestrator("unused.pdf", "test-job")
+    
+    def test_lineage_set_before_validation(self, orchestrator, monkeypatch):
+        """Test a retry's extraction has its attempt and parent when it is validated."""
+        validated = []
+        monkeypatch.setattr(orchestrator, "_validate_one",
+                            lambda e: validated.append((e.extraction_id, e.attempt, e.parent_extraction_id)))
+        monkeypatch.setattr(orchestrator, "_retry_with_ocr", lambda e, params: orchestrator._add_extraction(
+            Extraction(extraction_id="ext_t#a2", region_id="t#a2", data={})
+        ))
+        failed = Extraction(extraction_id="ext_t#a1", region_id="t#a1", data={}, attempt=1)
+        decision = AgentDecision(action=AgentDecision.Action.RETRY_OCR, confidence=1.0, evidence=[], explanation="")
+        
+        orchestrator._execute_retry(failed, decision)
+        orchestrator._add_extraction(Extraction(extraction_id="ext_u", region_id="u", data={}))
+        
+        assert validated == [("ext_t#a2", 2, "ext_t#a1"), ("ext_u", 0, None)]
+    
+    def test_rejected_fingerprints_are_a_list_copy(self, orchestrator, monkeypatch):
+        """Test each padded retry gets its own sorted list of rejected tables."""
+        monkeypatch.setattr(orchestrator, "_dispatch_to_specialist", lambda region: None)
+        orchestrator.graph.add_region(Region(
+            region_id="t", region_type=RegionType.TABLE, bbox=BBox(0.2, 0.2, 0.5, 0.5), page=0
+        ))
+        first = Extraction(extraction_id="ext_t", region_id="t", data={"rows": [["b"]]})
+        second = Extraction(extraction_id="ext_t#a1", region_id="t#a1", data={"rows": [["a"]]}, attempt=1)
+        
+        orchestrator._retry_with_padding(first, {"rejected_values": [first.data]})
+        orchestrator._retry_with_padding(second, {"rejected_values": [second.data]})
+        
+        hints = [orchestrator.graph.get_region(region_id).hints["rejected_fingerprints"] for region_id in ("t#a1", "t#a2")]
+        assert hints[0] == [(("b",),)]
+        assert hints[1] == [(("a",),), (("b",),)]
+        assert json.loads(json.dumps(hints[1])) == [[["a"]], [["b"]]]
+
+
+class TestCamelotFallback:
+    """A Camelot failure on one page doesn't cost the other pages' tables."""
+    
+    @staticmethod
+    def _fake_camelot(bad_page):
+        """camelot stand-in: one two-row table per page, raising if bad_page (1-indexed) is asked for"""
+        calls = []
+        
+        def read_pdf(path, pages, flavor, strip_text):
+            calls.append(pages)
+            page_list = pages.split(",")
+            if str(bad_page) in page_list:
+                raise ValueError(f"cannot parse page {bad_page}")
+            rows = [["Item", "Cost"], ["Data", "1.00"]]
+            return [SimpleNamespace(page=page, df=SimpleNamespace(values=SimpleNamespace(tolist=lambda: rows)))
+                    for page in page_list]
+        
+        return SimpleNamespace(read_pdf=read_pdf), calls
+    
+    def test_failed_batch_retried_per_page(self, monkeypatch):
+        """Test pages are retried one by one when the batch call fails."""
+        camelot, calls = self._fake_camelot(bad_page=2)
+        monkeypatch.setitem(sys.modules, "camelot", camelot)
+        monkeypatch.setattr(orchestrator_module.settings, "enable_llm_agents", False)
+        orchestrator = ExpertOrchestrator("unused.pdf", "test-job")
+        monkeypatch.setattr(orchestrator, "_validate_one", lambda extraction: None)
+        
+        orchestrator._extract_tables_with_camelot([0, 1, 2])
+        
+        assert calls == ["1,2,3", "1", "2", "3"]
+        assert [e.extraction_id for e in orchestrator.graph.extractions] == ["camelot_p0_t0", "camelot_p2_t0"]
+    
+    def test_batch_call_when_all_pages_parse(self, monkeypatch):
+        """Test Camelot is called once for all pages when nothing fails."""
+        camelot, calls = self._fake_camelot(bad_page=None)
+        monkeypatch.setitem(sys.modules, "camelot", camelot)
+        monkeypatch.setattr(orchestrator_module.settings, "enable_llm_agents", False)
+        orchestrator = ExpertOrchestrator("unused.pdf", "test-job")
+        monkeypatch.setattr(orchestrator, "_validate_one", lambda extraction: None)
+        
+        orchestrator._extract_tables_with_camelot([1, 0])
+        
+        assert calls == ["1,2"]
+        assert [e.extraction_id for e in orchestrator.graph.extractions] == ["camelot_p0_t0", "camelot_p1_t0"]
+
+
+class TestDispatch:
+    """Batched dispatch leaves the graph in region order."""
+    
+    def test_results_follow_region_order(self, monkeypatch):
+        """Test extractions, trace entries and validations follow the regions, not their types."""
+        from app.agents.table_agent import TableAgent
+        
+        monkeypatch.setattr(orchestrator_module.settings, "enable_llm_agents", False)
+        monkeypatch.setattr(TableAgent, "extract_batch", staticmethod(lambda graph, regions: [
+            Extraction(extraction_id=f"ext_{r.region_id}", region_id=r.region_id, data={"rows": []})
+            for r in regions
+        ]))
+        orchestrator = ExpertOrchestrator("unused.pdf", "test-job")
+        validated = []
+        monkeypatch.setattr(orchestrator, "_validate_one", lambda e: validated.append(e.region_id))
+        regions = [
+            Region(region_id=region_id, region_type=region_type, bbox=BBox(0.1, 0.1, 0.2, 0.2), page=0)
+            for region_id, region_type in [("t1", RegionType.TABLE), ("kv", RegionType.KEY_VALUE),
+                                           ("t2", RegionType.TABLE), ("list", RegionType.LIST)]
+        ]
+        
+        orchestrator._dispatch_batch(regions)
+        
+        expected = ["t1", "kv", "t2", "list"]
+        assert [e.region_id for e in orchestrator.graph.extractions] == expected
+        assert validated == expected
+        assert [(t["step"], t["region_id"]) for t in orchestrator.graph.trace] == [
+            ("dispatch_to_specialist", "t1"), ("table_extraction", "t1"),
+            ("dispatch_to_specialist", "kv"),
+            ("dispatch_to_specialist", "t2"), ("table_extraction", "t2"),
+            ("dispatch_to_specialist", "list"),
+        ]
@@ -0,0 +1,152 @@
+"""
+PDF backend tests.
+
+The PDFium and pypdf backends must agree on everything ingest decides from
+(page size, OCR threshold, ruling lines), so switching PDF_BACKEND never
+changes a job's result.
+"""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from app.agents.orchestrator import ExpertOrchestrator
+from app.services.pdf_backend import PDFIUM_AVAILABLE, PdfiumDocument, PypdfDocument
+
+
+FIXTURE_PDFS = sorted((Path(__file__).resolve().parents[2] / "test-pdfs").glob("*.pdf"))
+
+pytestmark = pytest.mark.skipif(not PDFIUM_AVAILABLE, reason="pypdfium2 not installed")
+
+
+@pytest.fixture
+def open_both():
+    """Open a PDF with both backends, closing them afterwards"""
+    opened = []
+    
+    def _open(path):
+        docs = PdfiumDocument(str(path)), PypdfDocument(str(path))
+        opened.extend(docs)
+        return docs
+    
+    yield _open
+    for doc in opened:
+        doc.close()
+
+
+def _write_pdf(tmp_path, width=300, height=500, rotation=0, cropbox=None, inherit_mediabox=False):
+    """One blank page with the given boxes and /Rotate"""
+    from pypdf import PdfWriter
+    from pypdf.generic import NameObject, RectangleObject
+    
+    writer = PdfWriter()
+    page = writer.add_blank_page(width=width, height=height)
+    if rotation:
+        page.rotation = rotation
+    if cropbox:
+        page.cropbox = RectangleObject(cropbox)
+    if inherit_mediabox:
+        pages = writer._root_object["/Pages"].get_object()
+        pages[NameObject("/MediaBox")] = RectangleObject([0, 0, width, height])
+        del page[NameObject("/MediaBox")]
+    
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    path = tmp_path / "page.pdf"
+    path.write_bytes(buffer.getvalue())
+    return path
+
+
+def _write_drawing(tmp_path, content: bytes):
+    """One blank page whose content stream is the given drawing operators"""
+    from pypdf import PdfWriter
+    from pypdf.generic import DecodedStreamObject, NameObject
+    
+    writer = PdfWriter()
+    page = writer.add_blank_page(width=300, height=500)
+    stream = DecodedStreamObject()
+    stream.set_data(content)
+    page[NameObject("/Contents")] = writer._add_object(stream)
+    
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    path = tmp_path / "drawing.pdf"
+    path.write_bytes(buffer.getvalue())
+    return path
+
+
+# Table rules drawn only as thin filled rectangles, the way many generators
+# emit them: four segments each in pypdf's count
+RECTANGLE_RULES = b"".join(b"20 %d 260 0.5 re f\n" % (100 + 40 * i) for i in range(5))
+
+
+@pytest.mark.skipif(not FIXTURE_PDFS, reason="fixture PDFs not available")
+class TestBackendParityOnFixtures:
+    """Test PDFium and pypdf give ingest the same answers on the sample bills."""
+    
+    @pytest.mark.parametrize("pdf_path", FIXTURE_PDFS, ids=lambda p: p.name)
+    def test_pages(self, pdf_path, open_both):
+        """Test page count, size, text layer, OCR decision and ruling lines match per page."""
+        pdfium_doc, pypdf_doc = open_both(pdf_path)
+        enough = ExpertOrchestrator.MIN_NATIVE_TEXT_CHARS
+        
+        assert pdfium_doc.num_pages == pypdf_doc.num_pages
+        for page_num in range(pdfium_doc.num_pages):
+            assert pdfium_doc.page_size(page_num) == pytest.approx(pypdf_doc.page_size(page_num), abs=1e-3)
+            assert pdfium_doc.has_text_layer(page_num) == pypdf_doc.has_text_layer(page_num)
+            # Estimates, so only which side of the threshold they fall on must agree
+            assert ((pdfium_doc.text_length(page_num, enough) >= enough) ==
+                    (pypdf_doc.text_length(page_num, enough) >= enough))
+            assert pdfium_doc.ruling_line_count(page_num) == pypdf_doc.ruling_line_count(page_num)
+
+
+class TestRulingLines:
+    """Test both backends count rectangle-drawn rules the same."""
+    
+    def test_rectangles(self, tmp_path, open_both):
+        """Test a page drawing only "re" rules counts four segments per rectangle in both backends."""
+        pdfium_doc, pypdf_doc = open_both(_write_drawing(tmp_path, RECTANGLE_RULES))
+        
+        assert pypdf_doc.ruling_line_count(0) == 20
+        assert pdfium_doc.ruling_line_count(0) == pypdf_doc.ruling_line_count(0)
+    
+    def test_single_rectangle_meets_threshold(self, tmp_path, open_both):
+        """Test a boxed table plus one rule lands on MIN_RULING_LINES in both backends."""
+        pdfium_doc, pypdf_doc = open_both(_write_drawing(tmp_path, b"20 100 260 300 re S\n10 50 m 290 50 l S\n"))
+        
+        assert pypdf_doc.ruling_line_count(0) == ExpertOrchestrator.MIN_RULING_LINES
+        assert pdfium_doc.ruling_line_count(0) == ExpertOrchestrator.MIN_RULING_LINES
+
+
+class TestPageSize:
+    """Test both backends report the unrotated MediaBox."""
+    
+    @pytest.mark.parametrize("kwargs", [
+        {},
+        {"rotation": 90},
+        {"cropbox": [20, 30, 200, 400]},
+        {"rotation": 270, "cropbox": [20, 30, 200, 400]},
+        {"inherit_mediabox": True},
+        {"inherit_mediabox": True, "rotation": 90},
+    ], ids=["plain", "rotated", "cropped", "rotated-cropped", "inherited", "inherited-rotated"])
+    def test_mediabox(self, tmp_path, open_both, kwargs):
+        """Test /Rotate and /CropBox don't change the size, and inherited boxes resolve."""
+        pdfium_doc, pypdf_doc = open_both(_write_pdf(tmp_path, **kwargs))
+        
+        assert pdfium_doc.page_size(0) == pytest.approx((300.0, 500.0))
+        assert pypdf_doc.page_size(0) == pytest.approx((300.0, 500.0))
+
+
+class TestTextLength:
+    """Test text length estimates ignore whitespace in both backends."""
+    
+    def test_padding_not_counted(self, open_both):
+        """Test padded page-number strings count the same in both backends."""
+        pdf_path = Path(__file__).resolve().parents[2] / "test-pdfs" / "my-bill 25 07.pdf"
+        if not pdf_path.exists():
+            pytest.skip("fixture PDFs not available")
+        pdfium_doc, pypdf_doc = open_both(pdf_path)
+        
+        # Page 2 only holds "Page 2 of 4", drawn as "(Page) Tj (       2) Tj ..."
+        assert pdfium_doc.text_length(1, 20) == pypdf_doc.text_length(1, 20) == len("Page24of")